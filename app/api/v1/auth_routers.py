@@ -4,10 +4,12 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.database import get_session
 from app.exceptions.exceptions import (
+    HashingPoolSaturatedError,
     InvalidCredentialsError,
     InvalidRefreshTokenError,
     UserNotFoundError,
 )
+from app.repositories.refresh_token_repository import get_refresh_token_store
 from app.repositories.user_repository import UserRepository
 from app.schemas.auth_schema import TokenRefreshRequest, TokenResponse
 from app.services.auth_service import AuthService
@@ -21,7 +23,7 @@ async def login(
     session: AsyncSession = Depends(get_session),
 ):
     repo = UserRepository(session)
-    service = AuthService(repo)
+    service = AuthService(repo, get_refresh_token_store(session))
 
     try:
         access, refresh = await service.login(
@@ -30,6 +32,10 @@ async def login(
         return TokenResponse(access_token=access, refresh_token=refresh)
     except (InvalidCredentialsError, UserNotFoundError) as e:
         raise HTTPException(status_code=401, detail=str(e))
+    except HashingPoolSaturatedError as e:
+        raise HTTPException(
+            status_code=503, detail=str(e), headers={"Retry-After": "1"}
+        )
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -39,7 +45,7 @@ async def refresh(
     body: TokenRefreshRequest, session: AsyncSession = Depends(get_session)
 ):
     repo = UserRepository(session)
-    service = AuthService(repo)
+    service = AuthService(repo, get_refresh_token_store(session))
 
     try:
         access, refresh = await service.refresh_tokens(body.refresh_token)
@@ -1,15 +1,19 @@
-import io
+import re
+from datetime import timezone
+from email.utils import format_datetime
 from typing import Optional
 from urllib.parse import quote
 
+from botocore.exceptions import ClientError
 from fastapi import APIRouter, Body, Depends
 from fastapi import File as FastAPIFile
-from fastapi import Form, HTTPException, UploadFile
+from fastapi import Form, Header, HTTPException, Response, UploadFile
 from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.database import get_session
 from app.dependencies.auth_depend import check_auth_dep
+from app.repositories.minio_repository import StoredObject
 from app.schemas.minio_schema import Directories
 from app.services.minio_service import MinioService
 
@@ -19,6 +23,28 @@ service = MinioService(bucket_name)
 router = APIRouter(prefix="/storage", tags=["storage"])
 
 
+class _StoredObjectResponse(StreamingResponse):
+    """
+    Отдает объект из S3 и всегда закрывает его тело. Генератор закрывает
+    тело сам, но если клиент отключился до начала отдачи, генератор так и
+    не запустится, а соединение осталось бы занятым в общем пуле.
+    """
+
+    def __init__(self, obj: StoredObject, **kwargs):
+        super().__init__(obj.iter_chunks(), **kwargs)
+        self.obj = obj
+
+    async def __call__(self, scope, receive, send):
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            self.obj.close()
+
+
+# S3 умеет отдавать только один диапазон за запрос
+_SINGLE_RANGE = re.compile(r"^bytes=(\d+-\d*|-\d+)$")
+
+
 @router.post("/{bucket_name}/upload")
 async def upload_file(
     bucket_name: str,
@@ -27,11 +53,9 @@ async def upload_file(
     directory: Optional[str] = Form(None),
 ):
     try:
-        content = await file.read()
-
-        await service.upload_file(
+        await service.upload_stream(
             filename=file.filename,
-            file=content,
+            file=file,
             bucket_name=bucket_name,
             directory=directory,
         )
@@ -45,15 +69,32 @@ async def list_files(
     bucket_name: str,
     current_user=Depends(check_auth_dep),
     directory: Optional[str] = Form(None),
+    recursive: bool = Form(False),
+    limit: Optional[int] = Form(None, ge=1, le=1000),
+    cursor: Optional[str] = Form(None),
 ):
     try:
-        files = await service.get_all_files(
-            directory=directory, bucket_name=bucket_name
+        listing = await service.list_directory(
+            directory=directory,
+            bucket_name=bucket_name,
+            recursive=recursive,
+            limit=limit,
+            cursor=cursor,
         )
-        return {"files": files}
+    except ClientError as e:
+        # испорченный или устаревший курсор
+        if e.response.get("Error", {}).get("Code") == "InvalidArgument":
+            raise HTTPException(status_code=400, detail=str(e))
+        raise HTTPException(status_code=500, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+    return {
+        "files": {item["name"]: item["type"] for item in listing["items"]},
+        "items": listing["items"],
+        "next_cursor": listing["next_cursor"],
+    }
+
 
 @router.post("/{bucket_name}/get-file/{filename}")
 async def get_file(
@@ -61,22 +102,57 @@ async def get_file(
     filename: str,
     current_user=Depends(check_auth_dep),
     directory: Optional[str] = Form(None),
+    range_header: Optional[str] = Header(None, alias="Range"),
+    if_none_match: Optional[str] = Header(None),
 ):
+    # несколько диапазонов S3 не поддерживает — такой Range игнорируем
+    # и отдаём файл целиком, это допускается RFC 9110
+    byte_range = None
+    if range_header and _SINGLE_RANGE.match(range_header.replace(" ", "")):
+        byte_range = range_header.replace(" ", "")
+
     try:
-        content = await service.get_file_content(
-            filename=filename, bucket_name=bucket_name, directory=directory
-        )
-        safe_filename = quote(filename)
-        return StreamingResponse(
-            io.BytesIO(content),
-            media_type="application/octet-stream",
-            headers={
-                "Content-Disposition": f"attachment; filename={safe_filename}"
-            },
+        obj = await service.open_file(
+            filename=filename,
+            bucket_name=bucket_name,
+            directory=directory,
+            byte_range=byte_range,
+            if_none_match=if_none_match,
         )
+    except ClientError as e:
+        if e.response.get("Error", {}).get("Code") == "InvalidRange":
+            raise HTTPException(status_code=416, detail=str(e))
+        raise HTTPException(status_code=404, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=404, detail=str(e))
 
+    headers = {"Accept-Ranges": "bytes"}
+    if obj.etag:
+        headers["ETag"] = obj.etag
+    if obj.not_modified:
+        return Response(status_code=304, headers=headers)
+
+    safe_filename = quote(filename)
+    headers["Content-Disposition"] = f"attachment; filename={safe_filename}"
+    if obj.content_length is not None:
+        headers["Content-Length"] = str(obj.content_length)
+    if obj.last_modified:
+        headers["Last-Modified"] = format_datetime(
+            obj.last_modified.astimezone(timezone.utc), usegmt=True
+        )
+
+    status_code = 200
+    if obj.content_range:
+        headers["Content-Range"] = obj.content_range
+        status_code = 206
+
+    return _StoredObjectResponse(
+        obj,
+        status_code=status_code,
+        media_type="application/octet-stream",
+        headers=headers,
+    )
+
 
 @router.delete("/{bucket_name}/delete-file/{filename}")
 async def delete_file(
@@ -103,30 +179,38 @@ async def move_file(
     directory_to: Optional[str] = Form(None),
 ):
     try:
-        content = await service.get_file_content(
-            filename=filename,
-            bucket_name=bucket_name,
-            directory=directory_from,
-        )
-
-        await service.upload_file(
+        await service.move_file(
             filename,
             bucket_name=bucket_name,
-            directory=directory_to,
-            file=content,
+            directory_from=directory_from,
+            directory_to=directory_to,
         )
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    return {"filename": filename, "status": "moved"}
 
-        new_content = await service.get_file_content(
-            filename=filename, bucket_name=bucket_name, directory=directory_to
-        )
-        if new_content != content:
-            raise HTTPException(
-                status_code=500, detail="File verification failed after upload"
-            )
 
-        await service.remove_file(
-            filename, bucket_name=bucket_name, directory=directory_from
+@router.post("/{bucket_name}/move-directory")
+async def move_directory(
+    bucket_name: str,
+    current_user=Depends(check_auth_dep),
+    directory_from: str = Form(...),
+    directory_to: str = Form(...),
+):
+    try:
+        result = await service.move_directory(
+            directory_from=directory_from,
+            directory_to=directory_to,
+            bucket_name=bucket_name,
         )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
-    return {"filename": filename, "status": "moved"}
+    return {
+        "directory": directory_from,
+        "status": "partially_moved" if result["failed"] else "moved",
+        **result,
+    }
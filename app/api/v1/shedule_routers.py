@@ -1,24 +1,23 @@
+from typing import List, Optional
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, File, HTTPException, UploadFile
+from fastapi import APIRouter, Depends, File, HTTPException, Query, UploadFile
+from fastapi.responses import StreamingResponse
 
 from app.core.database import get_session
 from app.dependencies.auth_depend import check_auth_dep
 from app.dependencies.premission_depend import check_duty_permission
 from app.entities.user import UserEntity
-from app.exceptions.exceptions import (
-    ExcelParsingError,
-    UserNotFoundError,
-    VigilsTypeNotFound,
-)
 from app.repositories.schedule_repository import ScheduleRepository
-from app.repositories.user_repository import UserRepository
-from app.schemas.schedule_schema import ReadVigils
+from app.schemas.schedule_schema import ReadCalendar, ReadVigils, ReadVigilStats
+from app.services.import_job_service import import_job_runner
 from app.services.schedule_service import ScheduleService
-from app.services.user_service import UserService
 
 router = APIRouter(prefix="/schedule", tags=["schedule"])
 
+# обязанность, дающая право загружать график нарядов
+SCHEDULE_DUTY_ID = UUID("180cd959-23d7-4fff-a7b7-da29e73bea9a")
+
 
 @router.get("/vigils")
 async def get_vigils(
@@ -28,7 +27,13 @@ async def get_vigils(
 ):
     service = ScheduleService(ScheduleRepository(session))
     try:
-        kwargs = params.model_dump()
+        kwargs = params.model_dump(exclude={"format"})
+
+        if params.format == "columnar":
+            columnar = await service.get_vigils_columnar(**kwargs)
+            return StreamingResponse(
+                columnar.iter_json(), media_type="application/json"
+            )
 
         vigils = await service.get_vigils(**kwargs)
         return [vigil.to_dict() for vigil in vigils]
@@ -36,17 +41,46 @@ async def get_vigils(
         raise HTTPException(status_code=400, detail=str(e))
 
 
-@router.post("/vigils")
+@router.get("/calendar")
+async def get_calendar(
+    params: ReadCalendar = Depends(),
+    session=Depends(get_session),
+    user: UserEntity = Depends(check_auth_dep),
+):
+    service = ScheduleService(ScheduleRepository(session))
+    return await service.get_calendar(year=params.year, month=params.month)
+
+
+@router.get("/stats")
+async def get_vigil_stats(
+    params: ReadVigilStats = Depends(),
+    user_ids: Optional[List[UUID]] = Query(None),
+    vigil_ids: Optional[List[UUID]] = Query(None),
+    session=Depends(get_session),
+    user: UserEntity = Depends(check_auth_dep),
+):
+    service = ScheduleService(ScheduleRepository(session))
+    try:
+        return await service.get_vigil_stats(
+            start_month=params.start_month,
+            end_month=params.end_month,
+            user_ids=user_ids,
+            vigil_ids=vigil_ids,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.post("/vigils", status_code=202)
 async def upload_vigils(
     file: UploadFile = File(..., description="Excel файл с расписанием"),
-    session=Depends(get_session),
     user: UserEntity = Depends(check_auth_dep),
 ):
-    await check_duty_permission(
-        duty_id=UUID("180cd959-23d7-4fff-a7b7-da29e73bea9a"),
-        user=user,
-        session=session,
-    )
+    """
+    Ставит импорт графика в очередь и сразу возвращает задачу.
+    Состояние — GET /schedule/vigils/jobs/{job_id}.
+    """
+    await check_duty_permission(duty_id=SCHEDULE_DUTY_ID, user=user)
     if not file.filename.endswith(".xlsx"):
         raise HTTPException(
             status_code=400,
@@ -59,17 +93,18 @@ async def upload_vigils(
     ]:
         raise HTTPException(status_code=400, detail="Неверный формат файла")
 
-    schedule_service = ScheduleService(ScheduleRepository(session))
-    user_service = UserService(UserRepository(session))
-    try:
-        file_bytes = await file.read()
-        info = await schedule_service.process_vigils_schedule(file_bytes)
-        all_users = await user_service.get_users_from_ids()
-        await schedule_service.create_vigils(info, all_users)
+    file_bytes = await file.read()
+    job = await import_job_runner.submit(file_bytes, user.id)
+    return job.to_dict()
 
-    except UserNotFoundError as e:
-        raise HTTPException(status_code=400, detail=str(e))
-    except VigilsTypeNotFound as e:
-        raise HTTPException(status_code=400, detail=str(e))
-    except ExcelParsingError as e:
-        raise HTTPException(status_code=400, detail=str(e))
+
+@router.get("/vigils/jobs/{job_id}")
+async def get_import_job(
+    job_id: UUID,
+    user: UserEntity = Depends(check_auth_dep),
+):
+    await check_duty_permission(duty_id=SCHEDULE_DUTY_ID, user=user)
+    job = await import_job_runner.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Задача импорта не найдена")
+    return job.to_dict()
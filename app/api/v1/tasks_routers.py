@@ -1,7 +1,7 @@
 from typing import Literal, Optional, List
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, Path, Query
+from fastapi import APIRouter, Depends, HTTPException, Path, Query, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.database import get_session
@@ -13,7 +13,7 @@ from app.entities.user import UserEntity
 from app.exceptions.exceptions import ResponsibleTypeError, UserNotFoundError
 from app.repositories.task_repository import TaskRepository
 from app.repositories.user_repository import UserRepository
-from app.schemas.task_schema import TaskCreate, TaskDelete, TaskUpdate
+from app.schemas.task_schema import ReadTasks, TaskCreate, TaskDelete, TaskUpdate
 from app.services.task_service import TaskService
 
 router = APIRouter(prefix="/tasks", tags=["tasks"])
@@ -82,19 +82,33 @@ async def user_task_create(
 
 @router.get("/")
 async def task_get(
-    ids: Optional[List[str]] = Query(None),
+    response: Response,
+    ids: Optional[List[UUID]] = Query(None),
+    params: ReadTasks = Depends(),
     session: AsyncSession = Depends(get_session),
     user: UserEntity = Depends(check_auth_dep),
 ):
     service = TaskService(TaskRepository(session), UserRepository(session))
-    tasks = await service.get(ids=ids, user_id=None if user.is_superuser else user.id)
+    try:
+        tasks, next_cursor = await service.get(
+            ids=ids,
+            user_id=None if user.is_superuser else user.id,
+            **params.model_dump(),
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
     return [task.to_dict() for task in tasks]
 
 
 
 @router.get("/{user_id}")
 async def user_tasks_get(
-    ids: Optional[List[str]] = Query(None),
+    response: Response,
+    ids: Optional[List[UUID]] = Query(None),
+    params: ReadTasks = Depends(),
     user_id: UUID = Path(..., description="ID пользователя"),
     session: AsyncSession = Depends(get_session),
     user: UserEntity = Depends(check_auth_dep),
@@ -104,7 +118,15 @@ async def user_tasks_get(
             raise HTTPException(status_code=403, detail="You are not have permissions")
 
     service = TaskService(TaskRepository(session), UserRepository(session))
-    tasks = await service.get(ids=ids, user_id=user_id)
+    try:
+        tasks, next_cursor = await service.get(
+            ids=ids, user_id=user_id, **params.model_dump()
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
     return [task.to_dict() for task in tasks]
 
 
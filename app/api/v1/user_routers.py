@@ -5,7 +5,10 @@ from fastapi import APIRouter, Depends, HTTPException, Query
 
 from app.core.database import get_session
 from app.entities.user import UserEntity
-from app.exceptions.exceptions import UserAlreadyExistsError
+from app.exceptions.exceptions import (
+    HashingPoolSaturatedError,
+    UserAlreadyExistsError,
+)
 from app.repositories.user_repository import UserRepository
 from app.schemas.user_schema import UserCreate
 from app.services.user_service import UserService
@@ -35,6 +38,10 @@ async def register(user_data: UserCreate, session=Depends(get_session)):
         return {"user": user_map, "detail": "User created successfully"}
     except UserAlreadyExistsError as e:
         raise HTTPException(status_code=400, detail=str(e))
+    except HashingPoolSaturatedError as e:
+        raise HTTPException(
+            status_code=503, detail=str(e), headers={"Retry-After": "1"}
+        )
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
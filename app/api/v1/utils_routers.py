@@ -7,7 +7,10 @@ from app.entities.company_duty import CompanyDutyEntity
 from app.entities.vigil_enum import VigilEnumEntity
 
 from app.entities.user import UserEntity
-from app.exceptions.exceptions import UserAlreadyExistsError
+from app.exceptions.exceptions import (
+    HashingPoolSaturatedError,
+    UserAlreadyExistsError,
+)
 
 from app.repositories.schedule_repository import ScheduleRepository
 from app.repositories.user_repository import UserRepository
@@ -181,5 +184,9 @@ async def update_data_config(session=Depends(get_session)):
         }
     except UserAlreadyExistsError as e:
         raise HTTPException(status_code=400, detail=str(e))
+    except HashingPoolSaturatedError as e:
+        raise HTTPException(
+            status_code=503, detail=str(e), headers={"Retry-After": "1"}
+        )
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -0,0 +1,27 @@
+from redis.exceptions import RedisError
+
+from app.core.redis import redis_client
+from app.logger.logger import logger
+
+KEY_PREFIX = "cache_version:"
+
+
+async def get_cache_version(name: str) -> int | None:
+    """
+    Текущая версия общего кэша из Redis. None — Redis недоступен,
+    тогда локальную копию кэша нужно считать устаревшей.
+    """
+    try:
+        version = await redis_client.get(f"{KEY_PREFIX}{name}")
+    except RedisError as e:
+        logger.warning(f"Версия кэша {name}: Redis недоступен: {e}")
+        return None
+    return int(version) if version else 0
+
+
+async def bump_cache_version(name: str):
+    """Сбрасывает локальные копии кэша во всех воркерах."""
+    try:
+        await redis_client.incr(f"{KEY_PREFIX}{name}")
+    except RedisError as e:
+        logger.warning(f"Версия кэша {name}: Redis недоступен: {e}")
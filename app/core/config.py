@@ -1,22 +1,92 @@
+from typing import Literal
+
 from pydantic_settings import BaseSettings
 
 
 class Settings(BaseSettings):
     DB_URL: str
+
+    # пул соединений и драйвер asyncpg
+    DB_ECHO: bool | Literal["debug"] = False
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: int = 30
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    # 0 отключает кэш подготовленных выражений (нужно за pgbouncer)
+    DB_STATEMENT_CACHE_SIZE: int = 100
+
     JWT_SECRET: str
     ACCESS_TOKEN_EXPIRE_MINUTES: int
     REFRESH_TOKEN_EXPIRE_DAYS: int
+    # сколько проверенных токенов держать в памяти процесса
+    JWT_CACHE_MAX_SIZE: int = 10_000
+
+    # пул для bcrypt: потоки и сколько операций может ждать в очереди
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_QUEUE_SIZE: int = 32
+
+    # где хранить refresh-токены: "sql" (таблица refresh_tokens) или "redis".
+    # Токены из таблицы в Redis не переносятся — после переключения на "redis"
+    # всем пользователям придется войти заново
+    REFRESH_TOKEN_STORE: str = "sql"
+
+    # пул процессов для разбора Excel
+    PARSING_POOL_WORKERS: int = 2
+    PARSING_TIMEOUT_SECONDS: int = 10
+    # парсер графика: "pandas" (весь лист в DataFrame) или "openpyxl" (построчно, read_only)
+    EXCEL_PARSER: str = "pandas"
+    # кэш разобранных книг в Redis по SHA-256 файла, лимит на суммарный размер
+    PARSED_WORKBOOK_CACHE_ENABLED: bool = True
+    PARSED_WORKBOOK_CACHE_MAX_BYTES: int = 64 * 1024 * 1024
+
+    # как часто сверять версию закэшированных справочников с Redis
+    REFERENCE_DATA_CHECK_SECONDS: float = 5
+
+    # сколько хранится собранный календарь нарядов за месяц
+    SCHEDULE_CALENDAR_CACHE_TTL_SECONDS: int = 24 * 60 * 60
+
+    # фоновые задачи импорта графика
+    IMPORT_JOB_CONCURRENCY: int = 1
+    IMPORT_JOB_TTL_SECONDS: int = 24 * 60 * 60
+    IMPORT_JOB_LOCK_SECONDS: int = 5 * 60
 
     # для Redis
     REDIS_HOST: str
     REDIS_PASSWORD: str
     REDIS_PORT: int
 
+    # кэш авторизованных пользователей (check_auth_dep)
+    PRINCIPAL_CACHE_TTL_SECONDS: int = 60
+    PRINCIPAL_CACHE_MAX_SIZE: int = 10_000
+    # как часто сверять версию кэша, чтобы увидеть сбросы из других воркеров
+    PRINCIPAL_CACHE_CHECK_SECONDS: float = 1
+    PRINCIPAL_CACHE_REDIS_ENABLED: bool = False
+
     # для Minio
     MINIO_ROOT_USER: str
     MINIO_ROOT_PASSWORD: str
     MINIO_ENDPOINT: str
 
+    # общий клиент S3: пул keep-alive соединений и повторы запросов
+    S3_MAX_POOL_CONNECTIONS: int = 50
+    S3_KEEPALIVE_SECONDS: float = 60
+    S3_CONNECT_TIMEOUT_SECONDS: float = 5
+    S3_READ_TIMEOUT_SECONDS: float = 60
+    S3_MAX_ATTEMPTS: int = 3
+
+    # загрузка файлов в хранилище частями (S3 multipart); часть не меньше 5 МБ,
+    # в памяти одновременно держится не больше S3_UPLOAD_CONCURRENCY + 1 частей
+    S3_UPLOAD_PART_SIZE: int = 8 * 1024 * 1024
+    S3_UPLOAD_CONCURRENCY: int = 4
+
+    # перенос папки в хранилище: сколько объектов копируется одновременно
+    S3_COPY_CONCURRENCY: int = 16
+
+    # кэш листингов папок хранилища; загрузки и удаления через API его сбрасывают
+    S3_LISTING_CACHE_ENABLED: bool = False
+    S3_LISTING_CACHE_TTL_SECONDS: int = 30
+
     # prometheus
     METRICS_TOKEN: str
 
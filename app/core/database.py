@@ -1,8 +1,13 @@
+import time
+
+from prometheus_client import Gauge, Histogram
+from sqlalchemy import make_url
 from sqlalchemy.ext.asyncio import (
     AsyncSession,
     async_sessionmaker,
     create_async_engine,
 )
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
 from app.core.config import settings
 from app.models.association_tables import (
@@ -21,7 +26,62 @@ from app.models.vigils_enum_model import VigilEnum
 from app.models.task_model import Task
 
 
-engine = create_async_engine(settings.DB_URL, echo=True, future=True)
+DB_POOL_WAIT = Histogram(
+    "db_pool_wait_seconds",
+    "Время ожидания соединения из пула",
+)
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """Пул, который замеряет время выдачи соединения."""
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            DB_POOL_WAIT.observe(time.perf_counter() - started)
+
+
+def _build_engine():
+    url = make_url(settings.DB_URL)
+    connect_args = {}
+    if url.get_driver_name() == "asyncpg":
+        # кэш asyncpg и кэш подготовленных выражений диалекта SQLAlchemy
+        cache_size = settings.DB_STATEMENT_CACHE_SIZE
+        connect_args["statement_cache_size"] = cache_size
+        url = url.update_query_dict(
+            {"prepared_statement_cache_size": str(cache_size)}
+        )
+
+    return create_async_engine(
+        url,
+        echo=settings.DB_ECHO,
+        future=True,
+        poolclass=InstrumentedQueuePool,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+        connect_args=connect_args,
+    )
+
+
+engine = _build_engine()
+
+Gauge(
+    "db_pool_checked_out_connections", "Соединения, выданные из пула"
+).set_function(lambda: engine.pool.checkedout())
+Gauge(
+    "db_pool_idle_connections", "Свободные соединения в пуле"
+).set_function(lambda: engine.pool.checkedin())
+Gauge(
+    "db_pool_overflow_connections", "Соединения сверх pool_size"
+).set_function(lambda: max(engine.pool.overflow(), 0))
+Gauge("db_pool_size", "Размер пула соединений").set_function(
+    lambda: engine.pool.size()
+)
 SessionLocal = async_sessionmaker(
     engine, expire_on_commit=False, class_=AsyncSession, autobegin=True
 )
@@ -1,19 +1,119 @@
-from contextlib import asynccontextmanager
+import asyncio
+from contextlib import AsyncExitStack, asynccontextmanager
+from contextvars import ContextVar
 from typing import AsyncGenerator
 
 import aioboto3
+from aiobotocore.config import AioConfig
+from aiobotocore.httpsession import AIOHTTPSession
+from prometheus_client import Counter
 
 from app.core.config import settings
 
 session = aioboto3.Session()
 
+S3_REQUESTS = Counter(
+    "s3_requests_total",
+    "HTTP-запросы к S3 (включая повторы) по операциям",
+    ["operation"],
+)
+S3_CONNECTIONS_OPENED = Counter(
+    "s3_connections_opened_total",
+    "Новые TCP-соединения с S3; остальные запросы шли по уже открытым",
+    ["operation"],
+)
+
+# операция текущего запроса, чтобы подписать открытое под него соединение
+_current_operation: ContextVar[str] = ContextVar(
+    "s3_operation", default="unknown"
+)
+
+
+def _count_request(event_name: str, **kwargs):
+    # event_name вида "before-send.s3.GetObject"
+    operation = event_name.rsplit(".", 1)[-1]
+    _current_operation.set(operation)
+    S3_REQUESTS.labels(operation).inc()
+
+
+class _MeteredHTTPSession(AIOHTTPSession):
+    def _create_connector(self, proxy_url):
+        connector = super()._create_connector(proxy_url)
+        # у aiohttp нет публичного хука на открытие соединения без
+        # trace_configs, а их aiobotocore не пробрасывает
+        create_connection = connector._create_connection
+
+        async def counted(*args, **kwargs):
+            S3_CONNECTIONS_OPENED.labels(_current_operation.get()).inc()
+            return await create_connection(*args, **kwargs)
+
+        connector._create_connection = counted
+        return connector
+
+
+class SharedS3Client:
+    """
+    Общий на приложение клиент S3 с пулом keep-alive соединений.
+    Создается в lifespan, чтобы запросы не платили за создание клиента,
+    разбор учетных данных и новое соединение. Вне lifespan (скрипты)
+    создается лениво при первом обращении.
+    """
+
+    def __init__(self):
+        self._client = None
+        self._stack: AsyncExitStack | None = None
+        self._lock = asyncio.Lock()
+
+    @staticmethod
+    def _config() -> AioConfig:
+        return AioConfig(
+            max_pool_connections=settings.S3_MAX_POOL_CONNECTIONS,
+            connect_timeout=settings.S3_CONNECT_TIMEOUT_SECONDS,
+            read_timeout=settings.S3_READ_TIMEOUT_SECONDS,
+            retries={
+                "max_attempts": settings.S3_MAX_ATTEMPTS,
+                "mode": "standard",
+            },
+            connector_args={
+                "keepalive_timeout": settings.S3_KEEPALIVE_SECONDS
+            },
+            http_session_cls=_MeteredHTTPSession,
+        )
+
+    async def start(self):
+        async with self._lock:
+            if self._client is not None:
+                return
+
+            stack = AsyncExitStack()
+            client = await stack.enter_async_context(
+                session.client(
+                    "s3",
+                    endpoint_url=settings.MINIO_ENDPOINT,
+                    aws_access_key_id=settings.MINIO_ROOT_USER,
+                    aws_secret_access_key=settings.MINIO_ROOT_PASSWORD,
+                    config=self._config(),
+                )
+            )
+            client.meta.events.register("before-send.s3", _count_request)
+            self._stack, self._client = stack, client
+
+    async def get(self):
+        if self._client is None:
+            await self.start()
+        return self._client
+
+    async def shutdown(self):
+        async with self._lock:
+            stack, self._stack, self._client = self._stack, None, None
+            if stack is not None:
+                await stack.aclose()
+
+
+s3_client = SharedS3Client()
+
 
 @asynccontextmanager
 async def get_s3_client() -> AsyncGenerator:
-    async with session.client(
-        "s3",
-        endpoint_url=settings.MINIO_ENDPOINT,
-        aws_access_key_id=settings.MINIO_ROOT_USER,
-        aws_secret_access_key=settings.MINIO_ROOT_PASSWORD,
-    ) as client:
-        yield client
+    # клиент общий, выход из контекста его не закрывает
+    yield await s3_client.get()
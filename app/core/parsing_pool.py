@@ -0,0 +1,98 @@
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from app.core.config import settings
+from app.logger.logger import logger
+
+
+def _warm_up():
+    """Инициализатор воркера: тяжелые импорты выполняются один раз при старте процесса."""
+    import openpyxl  # noqa: F401
+    import pandas  # noqa: F401
+
+
+def _ping():
+    return True
+
+
+class ParsingPool:
+    """
+    Общий на приложение пул процессов для разбора Excel.
+    Создается в lifespan и прогревается, чтобы запрос не платил за запуск
+    процесса и импорт pandas. Зависший разбор нельзя отменить внутри
+    процесса, поэтому по таймауту воркеры убиваются и пул пересоздается.
+    """
+
+    def __init__(self, workers: int):
+        self.workers = workers
+        self._executor: ProcessPoolExecutor | None = None
+
+    def _create_executor(self) -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_warm_up,
+        )
+
+    async def start(self) -> ProcessPoolExecutor:
+        """Возвращает текущий пул, при необходимости создав и прогрев новый."""
+        if self._executor is not None:
+            return self._executor
+        executor = self._executor = self._create_executor()
+
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(
+            *(
+                loop.run_in_executor(executor, _ping)
+                for _ in range(self.workers)
+            )
+        )
+        return executor
+
+    def _kill(self, executor: ProcessPoolExecutor):
+        """
+        Убивает воркеры именно этого пула. Если к этому времени другой запрос
+        уже создал новый пул, новый пул не трогаем.
+        """
+        if self._executor is executor:
+            self._executor = None
+        if hasattr(executor, "kill_workers"):  # Python 3.14+
+            executor.kill_workers()
+        else:
+            # до 3.14 до процессов пула не добраться без _processes
+            for process in list((executor._processes or {}).values()):
+                process.kill()
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    async def run(self, func, *args, timeout: float):
+        # пул фиксируется в локальной переменной: по таймауту убиваем тот,
+        # в котором шел разбор, а не тот, что окажется в self._executor.
+        # Пустого пула здесь быть не может — run_in_executor(None, ...)
+        # запустил бы разбор в потоке процесса с event loop
+        executor = await self.start()
+
+        loop = asyncio.get_running_loop()
+        try:
+            return await asyncio.wait_for(
+                loop.run_in_executor(executor, func, *args),
+                timeout=timeout,
+            )
+        except asyncio.TimeoutError:
+            logger.warning(
+                "Разбор в пуле превысил таймаут, воркеры перезапускаются"
+            )
+            self._kill(executor)
+            raise
+        except BrokenProcessPool:
+            self._kill(executor)
+            raise
+
+    def shutdown(self):
+        executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+
+parsing_pool = ParsingPool(workers=settings.PARSING_POOL_WORKERS)
@@ -0,0 +1,90 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from passlib.context import CryptContext
+from prometheus_client import Gauge, Histogram
+
+from app.core.config import settings
+from app.exceptions.exceptions import HashingPoolSaturatedError
+
+PASSWORD_HASH_QUEUE = Gauge(
+    "password_hash_queue_length",
+    "Операции хэширования паролей, ожидающие свободного потока",
+)
+PASSWORD_HASH_IN_FLIGHT = Gauge(
+    "password_hash_in_flight",
+    "Операции хэширования паролей в пуле (в работе и в очереди)",
+)
+PASSWORD_HASH_LATENCY = Histogram(
+    "password_hash_duration_seconds",
+    "Время выполнения bcrypt в потоке пула",
+    ["operation"],
+)
+
+
+class PasswordHasher:
+    """
+    Общий ограниченный пул для bcrypt, чтобы хэширование не блокировало event loop.
+    bcrypt отпускает GIL, поэтому достаточно потоков.
+    Если в пуле уже workers + queue_size операций — сразу отказываем,
+    а не копим бесконечную очередь.
+    """
+
+    pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+    def __init__(self, workers: int, queue_size: int):
+        self.workers = workers
+        self.limit = workers + queue_size
+        self._in_flight = 0
+        self._executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="password-hash"
+        )
+
+    def _update_gauges(self):
+        PASSWORD_HASH_IN_FLIGHT.set(self._in_flight)
+        PASSWORD_HASH_QUEUE.set(max(self._in_flight - self.workers, 0))
+
+    @staticmethod
+    def _timed(operation: str, func, *args):
+        started = time.perf_counter()
+        try:
+            return func(*args)
+        finally:
+            PASSWORD_HASH_LATENCY.labels(operation=operation).observe(
+                time.perf_counter() - started
+            )
+
+    async def _submit(self, operation: str, func, *args):
+        if self._in_flight >= self.limit:
+            raise HashingPoolSaturatedError(
+                "Сервер перегружен, попробуйте повторить запрос позже"
+            )
+
+        self._in_flight += 1
+        self._update_gauges()
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                self._executor, self._timed, operation, func, *args
+            )
+        finally:
+            self._in_flight -= 1
+            self._update_gauges()
+
+    async def hash(self, password: str) -> str:
+        return await self._submit("hash", self.pwd_context.hash, password)
+
+    async def verify(self, plain: str, hashed: str) -> bool:
+        return await self._submit(
+            "verify", self.pwd_context.verify, plain, hashed
+        )
+
+    def shutdown(self):
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+
+password_hasher = PasswordHasher(
+    workers=settings.PASSWORD_HASH_WORKERS,
+    queue_size=settings.PASSWORD_HASH_QUEUE_SIZE,
+)
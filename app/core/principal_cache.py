@@ -0,0 +1,195 @@
+import json
+import time
+from datetime import datetime
+from typing import Iterable
+from uuid import UUID
+
+from prometheus_client import Counter
+from redis.exceptions import RedisError
+
+from app.core.cache import TTLCache
+from app.core.cache_version import bump_cache_version, get_cache_version
+from app.core.config import settings
+from app.core.redis import redis_client
+from app.entities.company_duty import CompanyDutyEntity
+from app.entities.project import ProjectEntity
+from app.entities.task import TaskEntity
+from app.entities.user import UserEntity
+from app.logger.logger import logger
+
+PRINCIPAL_CACHE_HITS = Counter(
+    "principal_cache_hits_total",
+    "Попадания в кэш авторизованных пользователей",
+    ["tier"],
+)
+PRINCIPAL_CACHE_MISSES = Counter(
+    "principal_cache_misses_total",
+    "Промахи кэша авторизованных пользователей",
+)
+
+# hashed_password сюда не входит: авторизации он не нужен, а копировать
+# хэши паролей в общий Redis нельзя
+_USER_FIELDS = (
+    "username",
+    "name",
+    "surname",
+    "second_name",
+    "short_name",
+    "short_name_2",
+    "invocation",
+    "is_superuser",
+    "is_deleted",
+)
+
+
+def _dump_principal(user: UserEntity) -> dict:
+    """Сериализует пользователя в простые типы (общий формат для обоих уровней кэша)."""
+    data = {field: getattr(user, field) for field in _USER_FIELDS}
+    data["id"] = str(user.id)
+    data["post_id"] = str(user.post_id) if user.post_id else None
+    data["rank_id"] = str(user.rank_id) if user.rank_id else None
+    data["register_at"] = (
+        user.register_at.isoformat() if user.register_at else None
+    )
+    data["duties"] = [str(d.id) for d in user.duties or []]
+    data["projects"] = [str(p.id) for p in user.projects or []]
+    data["owner_tasks"] = [str(t.id) for t in user.owner_tasks or []]
+    data["responsible_tasks"] = [
+        str(t.id) for t in user.responsible_tasks or []
+    ]
+    return data
+
+
+def _load_principal(data: dict) -> UserEntity:
+    """Собирает новый UserEntity, чтобы вызывающий код не мог испортить кэш."""
+    return UserEntity(
+        id=UUID(data["id"]),
+        post_id=UUID(data["post_id"]) if data["post_id"] else None,
+        rank_id=UUID(data["rank_id"]) if data["rank_id"] else None,
+        register_at=(
+            datetime.fromisoformat(data["register_at"])
+            if data["register_at"]
+            else None
+        ),
+        duties=[CompanyDutyEntity(id=UUID(i)) for i in data["duties"]],
+        projects=[ProjectEntity(id=UUID(i)) for i in data["projects"]],
+        owner_tasks=[TaskEntity(id=UUID(i)) for i in data["owner_tasks"]],
+        responsible_tasks=[
+            TaskEntity(id=UUID(i)) for i in data["responsible_tasks"]
+        ],
+        **{field: data[field] for field in _USER_FIELDS},
+    )
+
+
+class PrincipalCache:
+    """
+    Кэш пользователей для check_auth_dep.
+    Первый уровень — LRU в памяти процесса, второй (опционально) — Redis,
+    общий для всех воркеров. Записи живут не дольше ttl и явно сбрасываются
+    при изменении пользователя, его обязанностей, проектов или задач.
+    Сброс увеличивает версию в Redis; остальные воркеры сверяют ее не реже
+    раза в check_interval секунд и при смене очищают свой первый уровень.
+    """
+
+    KEY_PREFIX = "principal:"
+    VERSION_NAME = "principal"
+
+    def __init__(
+        self,
+        maxsize: int,
+        ttl: int,
+        check_interval: float,
+        use_redis: bool = False,
+    ):
+        self.ttl = ttl
+        self.check_interval = check_interval
+        self.use_redis = use_redis
+        self._local = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._version: int | None = None
+        self._checked_at = 0.0
+
+    def _key(self, user_id: UUID) -> str:
+        return f"{self.KEY_PREFIX}{user_id}"
+
+    async def _check_version(self):
+        if time.monotonic() - self._checked_at < self.check_interval:
+            return
+        version = await get_cache_version(self.VERSION_NAME)
+        # None — Redis недоступен, сбросы других воркеров не видны
+        if version is None or version != self._version:
+            self._local.clear()
+        self._version = version
+        self._checked_at = time.monotonic()
+
+    async def get(self, user_id: UUID) -> UserEntity | None:
+        await self._check_version()
+        data = self._local.get(user_id)
+        if data is not None:
+            PRINCIPAL_CACHE_HITS.labels(tier="memory").inc()
+            return _load_principal(data)
+
+        if self.use_redis:
+            try:
+                raw = await redis_client.get(self._key(user_id))
+            except RedisError as e:
+                logger.warning(f"Principal cache: Redis недоступен: {e}")
+                raw = None
+            if raw is not None:
+                data = json.loads(raw)
+                self._local.set(user_id, data)
+                PRINCIPAL_CACHE_HITS.labels(tier="redis").inc()
+                return _load_principal(data)
+
+        PRINCIPAL_CACHE_MISSES.inc()
+        return None
+
+    async def set(self, user: UserEntity):
+        data = _dump_principal(user)
+        self._local.set(user.id, data)
+
+        if self.use_redis:
+            try:
+                await redis_client.set(
+                    self._key(user.id), json.dumps(data), ex=self.ttl
+                )
+            except RedisError as e:
+                logger.warning(f"Principal cache: Redis недоступен: {e}")
+
+    async def invalidate(self, user_ids: Iterable[UUID]):
+        user_ids = [u for u in user_ids if u]
+        for user_id in user_ids:
+            self._local.pop(user_id)
+
+        if self.use_redis and user_ids:
+            try:
+                await redis_client.delete(*[self._key(u) for u in user_ids])
+            except RedisError as e:
+                logger.warning(f"Principal cache: Redis недоступен: {e}")
+        if user_ids:
+            await bump_cache_version(self.VERSION_NAME)
+
+    async def clear(self):
+        """Полный сброс, например после массового изменения обязанностей или проектов."""
+        self._local.clear()
+
+        if self.use_redis:
+            try:
+                keys = [
+                    key
+                    async for key in redis_client.scan_iter(
+                        match=f"{self.KEY_PREFIX}*"
+                    )
+                ]
+                if keys:
+                    await redis_client.delete(*keys)
+            except RedisError as e:
+                logger.warning(f"Principal cache: Redis недоступен: {e}")
+        await bump_cache_version(self.VERSION_NAME)
+
+
+principal_cache = PrincipalCache(
+    maxsize=settings.PRINCIPAL_CACHE_MAX_SIZE,
+    ttl=settings.PRINCIPAL_CACHE_TTL_SECONDS,
+    check_interval=settings.PRINCIPAL_CACHE_CHECK_SECONDS,
+    use_redis=settings.PRINCIPAL_CACHE_REDIS_ENABLED,
+)
@@ -0,0 +1,14 @@
+from redis.asyncio import Redis
+
+from app.core.config import settings
+
+# Подключение создается лениво при первой команде
+redis_client = Redis(
+    host=settings.REDIS_HOST,
+    port=settings.REDIS_PORT,
+    password=settings.REDIS_PASSWORD,
+)
+
+
+async def shutdown_redis():
+    await redis_client.close()
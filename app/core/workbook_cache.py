@@ -0,0 +1,176 @@
+import datetime
+import json
+import time
+import zlib
+from typing import Any
+from uuid import UUID
+
+from prometheus_client import Counter
+from redis.exceptions import RedisError
+
+from app.core.config import settings
+from app.core.redis import redis_client
+from app.logger.logger import logger
+
+WORKBOOK_CACHE_HITS = Counter(
+    "parsed_workbook_cache_hits_total",
+    "Повторные загрузки Excel, взятые из кэша разобранных книг",
+)
+WORKBOOK_CACHE_MISSES = Counter(
+    "parsed_workbook_cache_misses_total",
+    "Загрузки Excel, которые пришлось разбирать заново",
+)
+WORKBOOK_CACHE_EVICTIONS = Counter(
+    "parsed_workbook_cache_evictions_total",
+    "Записи, вытесненные из кэша разобранных книг по лимиту размера",
+)
+
+# Запись книги и вытеснение самых давно использованных записей, пока
+# суммарный размер больше лимита. Новая запись не вытесняется никогда.
+# KEYS[1] — zset "запись -> время последнего обращения", KEYS[2] — hash размеров
+# ARGV: префикс ключей, запись, данные, время, лимит в байтах
+_SET_SCRIPT = """
+local member = ARGV[2]
+local size = string.len(ARGV[3])
+redis.call('SET', ARGV[1] .. member, ARGV[3])
+redis.call('ZADD', KEYS[1], ARGV[4], member)
+redis.call('HSET', KEYS[2], member, size)
+
+local total = 0
+for _, v in ipairs(redis.call('HVALS', KEYS[2])) do
+    total = total + tonumber(v)
+end
+
+local evicted = 0
+local limit = tonumber(ARGV[5])
+while total > limit and redis.call('ZCARD', KEYS[1]) > 1 do
+    local oldest = redis.call('ZRANGE', KEYS[1], 0, 0)[1]
+    if oldest == member then
+        break
+    end
+    total = total - tonumber(redis.call('HGET', KEYS[2], oldest) or 0)
+    redis.call('ZREM', KEYS[1], oldest)
+    redis.call('HDEL', KEYS[2], oldest)
+    redis.call('DEL', ARGV[1] .. oldest)
+    evicted = evicted + 1
+end
+return evicted
+"""
+
+
+def _encode(value: Any):
+    # даты и UUID хранятся строками с пометкой типа, чтобы восстановить их
+    # при чтении; сначала datetime — он подкласс date
+    if isinstance(value, datetime.datetime):
+        return {"__datetime__": value.isoformat()}
+    if isinstance(value, datetime.date):
+        return {"__date__": value.isoformat()}
+    if isinstance(value, UUID):
+        return {"__uuid__": str(value)}
+    raise TypeError(f"Не сериализуется в кэш книг: {type(value).__name__}")
+
+
+def _decode(obj: dict):
+    if len(obj) == 1:
+        if "__datetime__" in obj:
+            return datetime.datetime.fromisoformat(obj["__datetime__"])
+        if "__date__" in obj:
+            return datetime.date.fromisoformat(obj["__date__"])
+        if "__uuid__" in obj:
+            return UUID(obj["__uuid__"])
+    return obj
+
+
+def _dumps(value: Any) -> bytes:
+    return zlib.compress(
+        json.dumps(value, default=_encode, ensure_ascii=False).encode(), 1
+    )
+
+
+def _loads(raw: bytes) -> Any:
+    return json.loads(zlib.decompress(raw), object_hook=_decode)
+
+
+class ParsedWorkbookCache:
+    """
+    Кэш результатов разбора Excel в Redis по SHA-256 содержимого файла.
+    Версия парсера входит в ключ, поэтому после изменения кода парсера
+    старые записи не используются и со временем вытесняются как самые старые.
+    Суммарный размер ограничен max_bytes, вытесняются давно не запрашиваемые книги.
+    Результат хранится в JSON (сжатом zlib), а не pickle: данные из общего
+    Redis не должны исполнять код при чтении.
+    """
+
+    KEY_PREFIX = "parsed_workbook:"
+
+    def __init__(self, max_bytes: int, enabled: bool = True):
+        self.max_bytes = max_bytes
+        self.enabled = enabled
+        self._index_key = f"{self.KEY_PREFIX}index"
+        self._sizes_key = f"{self.KEY_PREFIX}sizes"
+        self._set_script = redis_client.register_script(_SET_SCRIPT)
+
+    @staticmethod
+    def _member(version: str, digest: str) -> str:
+        return f"{version}:{digest}"
+
+    async def get(self, version: str, digest: str) -> Any | None:
+        if not self.enabled:
+            return None
+
+        member = self._member(version, digest)
+        try:
+            raw = await redis_client.get(f"{self.KEY_PREFIX}{member}")
+            if raw is not None:
+                await redis_client.zadd(self._index_key, {member: time.time()})
+        except RedisError as e:
+            logger.warning(f"Кэш разобранных книг: Redis недоступен: {e}")
+            raw = None
+
+        value = None
+        if raw is not None:
+            try:
+                value = _loads(raw)
+            except (zlib.error, ValueError) as e:
+                # запись старого формата или испорченная — перезапишется
+                # после нового разбора
+                logger.warning(f"Кэш разобранных книг: не читается запись: {e}")
+
+        if value is None:
+            WORKBOOK_CACHE_MISSES.inc()
+            return None
+
+        WORKBOOK_CACHE_HITS.inc()
+        return value
+
+    async def set(self, version: str, digest: str, value: Any):
+        if not self.enabled:
+            return
+
+        payload = _dumps(value)
+        if len(payload) > self.max_bytes:
+            return
+
+        try:
+            evicted = await self._set_script(
+                keys=[self._index_key, self._sizes_key],
+                args=[
+                    self.KEY_PREFIX,
+                    self._member(version, digest),
+                    payload,
+                    time.time(),
+                    self.max_bytes,
+                ],
+            )
+        except RedisError as e:
+            logger.warning(f"Кэш разобранных книг: Redis недоступен: {e}")
+            return
+
+        if evicted:
+            WORKBOOK_CACHE_EVICTIONS.inc(evicted)
+
+
+parsed_workbook_cache = ParsedWorkbookCache(
+    max_bytes=settings.PARSED_WORKBOOK_CACHE_MAX_BYTES,
+    enabled=settings.PARSED_WORKBOOK_CACHE_ENABLED,
+)
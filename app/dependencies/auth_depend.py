@@ -3,6 +3,7 @@ from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.database import get_session
+from app.core.principal_cache import principal_cache
 from app.entities.user import UserEntity
 from app.exceptions.exceptions import (
     InvalidRefreshTokenError,
@@ -24,7 +25,10 @@ async def check_auth_dep(
     try:
         user_id = await service.verify_token(token, "access")
         try:
-            user = await user_repo.get_by_id(user_id)
+            user = await principal_cache.get(user_id)
+            if user is None:
+                user = await user_repo.get_by_id(user_id)
+                await principal_cache.set(user)
         except UserNotFoundError:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
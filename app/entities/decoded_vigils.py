@@ -0,0 +1,14 @@
+from datetime import datetime
+from typing import List, NamedTuple
+from uuid import UUID
+
+
+class DecodedVigils(NamedTuple):
+    """Параллельные массивы нарядов, готовые к записи в schedule_vigil."""
+
+    user_ids: List[UUID]
+    dates: List[datetime]
+    vigil_ids: List[UUID]
+
+    def __len__(self) -> int:
+        return len(self.vigil_ids)
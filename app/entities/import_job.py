@@ -0,0 +1,17 @@
+from dataclasses import dataclass
+from datetime import datetime
+from uuid import UUID
+from app.entities.base_entity import BaseEntity
+
+@dataclass
+class ImportJobEntity(BaseEntity):
+    id: UUID | None = None
+    status: str | None = None
+    stage: str | None = None
+    progress: int | None = None
+    error: str | None = None
+    result: dict | None = None
+    file_hash: str | None = None
+    created_by: UUID | None = None
+    created_at: datetime | None = None
+    finished_at: datetime | None = None
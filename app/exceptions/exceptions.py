@@ -41,4 +41,10 @@ class ErrorTaskSettings(Exception):
     pass
 
 class TaskNotFound(Exception):
-    pass
\ No newline at end of file
+    pass
+
+class HashingPoolSaturatedError(Exception):
+    pass
+
+class ImportJobSuperseded(Exception):
+    pass
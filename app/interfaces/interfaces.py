@@ -1,10 +1,12 @@
 from abc import ABC, abstractmethod
-from typing import List
-from datetime import datetime
+from typing import AsyncIterator, List, Sequence, Tuple
+from datetime import date, datetime
 from uuid import UUID
 
 from app.entities.attachment import AttachmentEntity
 from app.entities.company_duty import CompanyDutyEntity
+from app.entities.decoded_vigils import DecodedVigils
+from app.entities.import_job import ImportJobEntity
 from app.entities.post import PostEntity
 from app.entities.rank import RankEntity
 from app.entities.task import TaskEntity
@@ -29,28 +31,54 @@ class IScheduleRepository(ABC):
         raise NotImplementedError
 
     @abstractmethod
-    async def save_responsible_schedule(
-        self, responsible: dict, start_date: datetime, end_date: datetime
-    ):
+    def stream_vigils(
+        self,
+        start_at: datetime = None,
+        end_at: datetime = None,
+        user_ids: List[UUID] = None,
+        vigil_ids: List[UUID] = None,
+        ignore_id: UUID = None,
+        batch_size: int = 5000,
+    ) -> AsyncIterator[Sequence]:
         raise NotImplementedError
 
     @abstractmethod
-    async def save_group_control_schedule(
+    async def get_calendar(
+        self, start_at: datetime, end_at: datetime
+    ) -> Tuple[List, List[datetime]]:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def get_stats(
         self,
-        group_control_schedule: list,
-        start_date: datetime,
-        end_date: datetime,
-    ):
+        start_month: date,
+        end_month: date,
+        user_ids: List[UUID] = None,
+        vigil_ids: List[UUID] = None,
+    ) -> List:
         raise NotImplementedError
 
     @abstractmethod
-    async def get_vigils_type(self, name: List[str] = None):
+    async def get_longest_streaks(
+        self,
+        start_at: datetime,
+        end_at: datetime,
+        user_ids: List[UUID] = None,
+        vigil_ids: List[UUID] = None,
+    ) -> dict:
         raise NotImplementedError
 
     @abstractmethod
-    async def save_vigils_schedule(
-        self, vigils_schedule: dict, start_date: datetime, end_date: datetime
-    ):
+    async def publish_schedule(
+        self,
+        group_control: list,
+        group_control_period: Tuple[datetime, datetime],
+        responsible: dict,
+        responsible_period: Tuple[datetime, datetime],
+        vigils: DecodedVigils,
+        vigils_period: Tuple[datetime, datetime],
+        responsible_vigil_id: UUID,
+    ) -> dict:
         raise NotImplementedError
 
 
@@ -86,21 +114,15 @@ class IUserRepository(ABC):
         raise NotImplementedError
 
     @abstractmethod
-    async def get_by_id(self, user_id: UUID) -> UserEntity | None:
-        raise NotImplementedError
-
-    @abstractmethod
-    async def create(self, user: UserEntity) -> UserEntity:
+    async def get_user_names(self) -> List[Tuple[UUID, str, str]]:
         raise NotImplementedError
 
     @abstractmethod
-    async def save_refresh_token(
-        self, user_id: UUID, refresh_token: str
-    ) -> None:
+    async def get_by_id(self, user_id: UUID) -> UserEntity | None:
         raise NotImplementedError
 
     @abstractmethod
-    async def get_refresh_token(self, user_id: UUID) -> str | None:
+    async def create(self, user: UserEntity) -> UserEntity:
         raise NotImplementedError
 
     @abstractmethod
@@ -122,6 +144,61 @@ class IUserRepository(ABC):
                   projects_ids: List[UUID]) -> List[UserEntity]:
         raise NotImplementedError
 
+class IRefreshTokenStore(ABC):
+    @abstractmethod
+    async def save(self, user_id: UUID, refresh_token: str) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def get(self, user_id: UUID) -> str | None:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def rotate(
+        self, user_id: UUID, old_token: str, new_token: str
+    ) -> None:
+        raise NotImplementedError
+
+
+class IReferenceDataRepository(ABC):
+    @abstractmethod
+    async def get_all(
+        self,
+    ) -> Tuple[
+        List[VigilEnumEntity],
+        List[RankEntity],
+        List[PostEntity],
+        List[CompanyDutyEntity],
+    ]:
+        raise NotImplementedError
+
+
+class IImportJobStore(ABC):
+    @abstractmethod
+    async def save(self, job: ImportJobEntity) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def get(self, job_id: UUID) -> ImportJobEntity | None:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def delete(self, job_id: UUID) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def claim_file(self, file_hash: str, job_id: UUID) -> UUID:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def refresh_file(self, file_hash: str, job_id: UUID) -> bool:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def release_file(self, file_hash: str, job_id: UUID) -> None:
+        raise NotImplementedError
+
+
 class ITaskRepository(ABC):
     @abstractmethod
     async def create_attachment(self, task_id: UUID, path: str, filename: str) -> AttachmentEntity:
@@ -141,8 +218,16 @@ class ITaskRepository(ABC):
 
     @abstractmethod
     async def get(
-        self, task_ids: List[UUID], responsible_id: UUID
-    ) -> List[TaskEntity]:
+        self,
+        task_ids: List[UUID],
+        responsible_id: UUID,
+        owner_id: UUID,
+        status: str,
+        expired_from: datetime,
+        expired_to: datetime,
+        cursor: str,
+        limit: int,
+    ) -> Tuple[List[TaskEntity], str | None]:
         raise NotImplementedError
 
     @abstractmethod
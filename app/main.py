@@ -22,13 +22,27 @@ from app.api.v1 import (
 )
 from app.core.config import settings
 from app.core.database import engine, init_db, shutdown_db
+from app.core.minio import s3_client
+from app.core.parsing_pool import parsing_pool
+from app.core.password_hashing import password_hasher
+from app.core.redis import shutdown_redis
+from app.services.import_job_service import import_job_runner
+from app.services.reference_data import reference_data
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     await init_db(engine)
+    await reference_data.load()
+    await parsing_pool.start()
+    await s3_client.start()
     yield
+    await import_job_runner.shutdown()
+    parsing_pool.shutdown()
+    await s3_client.shutdown()
     await shutdown_db(engine)
+    await shutdown_redis()
+    password_hasher.shutdown()
 
 
 app = FastAPI(title="CP", lifespan=lifespan)
@@ -4,6 +4,7 @@ from app.models.projects_model import Project
 from app.models.ranks_model import Rank
 from app.models.user_model import User
 from app.models.schedule_vigil_model import ScheduleVigil
+from app.models.schedule_vigil_stats_model import ScheduleVigilStats
 from app.models.refresh_token_model import RefreshToken
 from app.models.task_model import Task
 from app.models.attachment_model import Attachment
@@ -24,6 +25,7 @@ __all__ = [
     "Rank",
     "Project",
     "ScheduleVigil",
+    "ScheduleVigilStats",
     "RefreshToken",
     "associate_users_duties",
     "associate_users_projects",
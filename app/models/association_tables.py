@@ -1,6 +1,6 @@
 import uuid
 
-from sqlalchemy import UUID, Column, ForeignKey, Table
+from sqlalchemy import UUID, Column, ForeignKey, Index, Table
 
 from app.models.base_model import Base
 
@@ -13,6 +13,8 @@ associate_task_responsibles = Table(
     Column(
         "user_id", UUID(as_uuid=True), ForeignKey("users.id"), primary_key=True
     ),
+    # первичный ключ (task_id, user_id) не помогает искать задачи пользователя
+    Index("associate_task_responsibles_user_id_task_id_idx", "user_id", "task_id"),
 )
 
 associate_users_duties = Table(
@@ -0,0 +1,19 @@
+from sqlalchemy import DATE, Column, ForeignKey, Integer, SmallInteger, UUID
+
+from app.models.base_model import Base
+
+
+class ScheduleVigilStats(Base):
+    """
+    Свертка schedule_vigil: число нарядов пользователя по типу наряда,
+    месяцу и дню недели (0 — понедельник). Поддерживается при каждом
+    импорте графика в той же транзакции, что и сами наряды.
+    """
+
+    __tablename__ = "schedule_vigil_stats"
+
+    month = Column(DATE, primary_key=True)
+    user_id = Column(UUID, ForeignKey("users.id"), primary_key=True)
+    vigil_id = Column(UUID, ForeignKey("vigil_enum.id"), primary_key=True)
+    weekday = Column(SmallInteger, primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
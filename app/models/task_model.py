@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, UUID, ForeignKey, TIMESTAMP, Boolean
+from sqlalchemy import Column, String, UUID, ForeignKey, TIMESTAMP, Boolean, Index
 from sqlalchemy.orm import relationship
 import uuid
 from datetime import datetime
@@ -40,4 +40,10 @@ class Task(Base):
         "Attachment",
         cascade="all, delete-orphan",
         lazy="selectin"
+    )
+
+    __table_args__ = (
+        Index("tasks_created_at_id_idx", "created_at", "id"),
+        Index("tasks_owner_id_created_at_id_idx", "owner_id", "created_at", "id"),
+        Index("tasks_expired_at_idx", "expired_at"),
     )
\ No newline at end of file
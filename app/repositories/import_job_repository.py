@@ -0,0 +1,140 @@
+import json
+from datetime import datetime
+from uuid import UUID
+
+from app.core.config import settings
+from app.core.redis import redis_client
+from app.entities.import_job import ImportJobEntity
+from app.interfaces.interfaces import IImportJobStore
+
+# Закрепить файл за задачей или узнать, за кем он уже закреплен — атомарно,
+# чтобы между SET NX и GET закрепление не могло пропасть.
+# Возвращает id задачи, за которой файл закреплен после вызова.
+_CLAIM_SCRIPT = """
+if redis.call('SET', KEYS[1], ARGV[1], 'NX', 'EX', ARGV[2]) then
+    return ARGV[1]
+end
+return redis.call('GET', KEYS[1])
+"""
+
+# Снять закрепление файла, только если оно всё ещё принадлежит этой задаче.
+_RELEASE_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+# Продлить закрепление своей задачи или занять освободившееся.
+# 1 — файл закреплен за задачей, 0 — его уже взяла другая задача.
+_REFRESH_SCRIPT = """
+local current = redis.call('GET', KEYS[1])
+if current and current ~= ARGV[1] then
+    return 0
+end
+redis.call('SET', KEYS[1], ARGV[1], 'EX', ARGV[2])
+return 1
+"""
+
+
+def _dump_job(job: ImportJobEntity) -> str:
+    return json.dumps(
+        {
+            "id": str(job.id),
+            "status": job.status,
+            "stage": job.stage,
+            "progress": job.progress,
+            "error": job.error,
+            "result": job.result,
+            "file_hash": job.file_hash,
+            "created_by": str(job.created_by) if job.created_by else None,
+            "created_at": job.created_at.isoformat() if job.created_at else None,
+            "finished_at": (
+                job.finished_at.isoformat() if job.finished_at else None
+            ),
+        }
+    )
+
+
+def _load_job(raw: bytes) -> ImportJobEntity:
+    data = json.loads(raw)
+    return ImportJobEntity(
+        id=UUID(data["id"]),
+        status=data["status"],
+        stage=data["stage"],
+        progress=data["progress"],
+        error=data["error"],
+        result=data["result"],
+        file_hash=data["file_hash"],
+        created_by=UUID(data["created_by"]) if data["created_by"] else None,
+        created_at=(
+            datetime.fromisoformat(data["created_at"])
+            if data["created_at"]
+            else None
+        ),
+        finished_at=(
+            datetime.fromisoformat(data["finished_at"])
+            if data["finished_at"]
+            else None
+        ),
+    )
+
+
+class RedisImportJobStore(IImportJobStore):
+    """
+    Задачи импорта графика в Redis, общие для всех воркеров API.
+    Пока задача выполняется, хэш файла закреплен за ней — повторная загрузка
+    того же файла возвращает уже идущую задачу. Закрепление живет
+    IMPORT_JOB_LOCK_SECONDS и продлевается в начале каждого этапа,
+    поэтому после падения процесса файл снова можно загрузить.
+    Снимает и продлевает закрепление только задача, которой оно принадлежит.
+    """
+
+    KEY_PREFIX = "import_job:"
+    FILE_KEY_PREFIX = "import_job:file:"
+
+    def __init__(self, client=redis_client):
+        self.client = client
+        self.ttl = settings.IMPORT_JOB_TTL_SECONDS
+        self.lock_ttl = settings.IMPORT_JOB_LOCK_SECONDS
+        self._claim = client.register_script(_CLAIM_SCRIPT)
+        self._release = client.register_script(_RELEASE_SCRIPT)
+        self._refresh = client.register_script(_REFRESH_SCRIPT)
+
+    def _key(self, job_id: UUID) -> str:
+        return f"{self.KEY_PREFIX}{job_id}"
+
+    def _file_key(self, file_hash: str) -> str:
+        return f"{self.FILE_KEY_PREFIX}{file_hash}"
+
+    async def save(self, job: ImportJobEntity) -> None:
+        await self.client.set(self._key(job.id), _dump_job(job), ex=self.ttl)
+
+    async def delete(self, job_id: UUID) -> None:
+        await self.client.delete(self._key(job_id))
+
+    async def get(self, job_id: UUID) -> ImportJobEntity | None:
+        raw = await self.client.get(self._key(job_id))
+        return _load_job(raw) if raw else None
+
+    async def claim_file(self, file_hash: str, job_id: UUID) -> UUID:
+        """
+        Закрепляет файл за задачей. Возвращает id задачи, за которой файл
+        закреплен: job_id — закрепили, другой id — файл уже в работе у нее.
+        """
+        owner = await self._claim(
+            keys=[self._file_key(file_hash)], args=[str(job_id), self.lock_ttl]
+        )
+        return UUID(owner.decode())
+
+    async def refresh_file(self, file_hash: str, job_id: UUID) -> bool:
+        result = await self._refresh(
+            keys=[self._file_key(file_hash)], args=[str(job_id), self.lock_ttl]
+        )
+        return result == 1
+
+    async def release_file(self, file_hash: str, job_id: UUID) -> None:
+        await self._release(keys=[self._file_key(file_hash)], args=[str(job_id)])
+
+
+redis_import_job_store = RedisImportJobStore()
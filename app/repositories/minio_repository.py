@@ -1,6 +1,66 @@
-from botocore.exceptions import ClientError
+import asyncio
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, AsyncIterator, Protocol
 
+from botocore.exceptions import BotoCoreError, ClientError
+
+from app.core.config import settings
 from app.core.minio import get_s3_client
+from app.logger.logger import logger
+
+# минимальный размер части multipart-загрузки в S3 (кроме последней)
+MIN_PART_SIZE = 5 * 1024 * 1024
+
+# размер куска, которым тело объекта отдаётся клиенту при скачивании
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+
+
+class AsyncReadable(Protocol):
+    async def read(self, size: int = -1) -> bytes: ...
+
+
+@dataclass
+class StoredObject:
+    """
+    Открытый на чтение объект из S3. iter_chunks() отдаёт содержимое кусками.
+    Соединение с S3 занято, пока объект не закрыт: close() нужно вызвать
+    в любом случае, даже если чтение так и не началось. Для not_modified=True
+    тела нет, заполнен только etag.
+    """
+
+    etag: str | None = None
+    content_length: int | None = None
+    content_range: str | None = None
+    content_type: str | None = None
+    last_modified: datetime | None = None
+    not_modified: bool = False
+    body: Any = None  # StreamingBody ответа S3
+
+    async def iter_chunks(self) -> AsyncIterator[bytes]:
+        try:
+            async for chunk in self.body.iter_chunks(DOWNLOAD_CHUNK_SIZE):
+                yield chunk
+        finally:
+            self.close()
+
+    def close(self):
+        # повторный вызов и вызов после полного чтения ничего не делают
+        if self.body is not None:
+            self.body.close()
+
+
+async def _read_part(stream: AsyncReadable, size: int) -> bytes:
+    """Читает из потока ровно size байт или всё, что осталось до конца."""
+    chunks = []
+    remaining = size
+    while remaining > 0:
+        chunk = await stream.read(remaining)
+        if not chunk:
+            break
+        chunks.append(chunk)
+        remaining -= len(chunk)
+    return b"".join(chunks)
 
 
 class MinioRepository:
@@ -10,82 +70,366 @@ class MinioRepository:
     async def upload_file(
         self, key: str, data: bytes, bucket_name: str = None
     ):
-        if bucket_name:
-            self.bucket_name = bucket_name
+        bucket = bucket_name or self.bucket_name
         async with get_s3_client() as s3:
-            await s3.put_object(Bucket=self.bucket_name, Key=key, Body=data)
+            await s3.put_object(Bucket=bucket, Key=key, Body=data)
 
-    async def list_files(
-        self, bucket_name: str = None, directory: str = None
-    ) -> dict[str, str]:
-        if bucket_name:
-            self.bucket_name = bucket_name
+    async def upload_stream(
+        self,
+        key: str,
+        stream: AsyncReadable,
+        bucket_name: str = None,
+        part_size: int = None,
+        concurrency: int = None,
+    ):
+        """
+        Загружает поток в S3 частями по part_size байт, не больше concurrency
+        частей одновременно. Следующая часть читается только когда освободился
+        слот, поэтому в памяти не больше concurrency + 1 частей при любом размере
+        файла. Файл меньше одной части отправляется обычным put_object.
+        При ошибке multipart-загрузка отменяется, чтобы в бакете
+        не оставались недогруженные части.
+        """
+        bucket = bucket_name or self.bucket_name
+        part_size = max(part_size or settings.S3_UPLOAD_PART_SIZE, MIN_PART_SIZE)
+        concurrency = max(concurrency or settings.S3_UPLOAD_CONCURRENCY, 1)
 
-        prefix = f"{directory.rstrip('/')}/" if directory else ""
+        data = await _read_part(stream, part_size)
+        if len(data) < part_size:
+            async with get_s3_client() as s3:
+                await s3.put_object(
+                    Bucket=bucket, Key=key, Body=data
+                )
+            return
 
         async with get_s3_client() as s3:
-            response = await s3.list_objects_v2(
-                Bucket=self.bucket_name,
-                Prefix=prefix,
-                Delimiter="/",
+            upload = await s3.create_multipart_upload(
+                Bucket=bucket, Key=key
             )
+            upload_id = upload["UploadId"]
+            slots = asyncio.Semaphore(concurrency)
+            tasks: list[asyncio.Task] = []
+
+            async def send_part(number: int, body: bytes) -> dict:
+                try:
+                    response = await s3.upload_part(
+                        Bucket=bucket,
+                        Key=key,
+                        UploadId=upload_id,
+                        PartNumber=number,
+                        Body=body,
+                    )
+                    return {"PartNumber": number, "ETag": response["ETag"]}
+                finally:
+                    slots.release()
 
-            result: dict[str, str] = {}
+            try:
+                number = 1
+                while data:
+                    await slots.acquire()
+                    # не читаем дальше, если какая-то часть уже не загрузилась
+                    for task in tasks:
+                        if task.done() and task.exception():
+                            slots.release()
+                            raise task.exception()
+                    tasks.append(
+                        asyncio.create_task(send_part(number, data))
+                    )
+                    data = await _read_part(stream, part_size)
+                    number += 1
+
+                parts = await asyncio.gather(*tasks)
+                await s3.complete_multipart_upload(
+                    Bucket=bucket,
+                    Key=key,
+                    UploadId=upload_id,
+                    MultipartUpload={"Parts": parts},
+                )
+            except BaseException:
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+                try:
+                    await s3.abort_multipart_upload(
+                        Bucket=bucket, Key=key, UploadId=upload_id
+                    )
+                except (BotoCoreError, ClientError) as e:
+                    logger.warning(
+                        f"Не удалось отменить multipart-загрузку {key}: {e}"
+                    )
+                raise
 
-            # --- папки ---
-            for common_prefix in response.get("CommonPrefixes", []):
-                folder_name = common_prefix["Prefix"].split("/")[-2] + "/"
-                result[folder_name] = "dir"
+    @staticmethod
+    def _list_params(bucket: str, prefix: str, recursive: bool) -> dict:
+        params = {"Bucket": bucket, "Prefix": prefix}
+        if not recursive:
+            params["Delimiter"] = "/"
+        return params
 
-            # --- файлы ---
-            for obj in response.get("Contents", []):
-                # убираем путь к директории, оставляем только имя
-                filename = obj["Key"].split("/")[-1]
-                if filename:  # исключаем "пустые" ключи (папки)
-                    result[filename] = "file"
+    @staticmethod
+    def _entries(page: dict, prefix: str) -> list[dict]:
+        """Записи одной страницы листинга, имена — относительно prefix."""
+        entries = []
+
+        # --- папки ---
+        for common_prefix in page.get("CommonPrefixes", []):
+            entries.append(
+                {
+                    "name": common_prefix["Prefix"][len(prefix):],
+                    "type": "dir",
+                    "size": None,
+                    "last_modified": None,
+                }
+            )
+
+        # --- файлы ---
+        for obj in page.get("Contents", []):
+            name = obj["Key"][len(prefix):]
+            if not name:  # сам "пустой" ключ папки
+                continue
+            entries.append(
+                {
+                    "name": name,
+                    # в рекурсивном режиме пустые ключи вложенных папок
+                    "type": "dir" if name.endswith("/") else "file",
+                    "size": obj["Size"],
+                    "last_modified": obj["LastModified"].isoformat(),
+                }
+            )
+        return entries
 
-            return result
+    async def iter_entries(
+        self,
+        bucket_name: str = None,
+        directory: str = None,
+        recursive: bool = False,
+    ) -> AsyncIterator[dict]:
+        """
+        Все записи папки страница за страницей (S3 отдает не больше 1000
+        ключей за запрос). В рекурсивном режиме — все объекты под папкой
+        с путями относительно нее, без отдельных записей для подпапок.
+        """
+        bucket = bucket_name or self.bucket_name
+
+        prefix = f"{directory.rstrip('/')}/" if directory else ""
+        params = self._list_params(bucket, prefix, recursive)
+
+        async with get_s3_client() as s3:
+            paginator = s3.get_paginator("list_objects_v2")
+            async for page in paginator.paginate(**params):
+                for entry in self._entries(page, prefix):
+                    yield entry
+
+    async def list_page(
+        self,
+        limit: int,
+        cursor: str = None,
+        bucket_name: str = None,
+        directory: str = None,
+        recursive: bool = False,
+    ) -> tuple[list[dict], str | None]:
+        """
+        Одна страница листинга не больше limit записей. Курсор — токен
+        продолжения S3; None в ответе означает, что записей больше нет.
+        """
+        bucket = bucket_name or self.bucket_name
+
+        prefix = f"{directory.rstrip('/')}/" if directory else ""
+        params = self._list_params(bucket, prefix, recursive)
+        params["MaxKeys"] = limit
+        if cursor:
+            params["ContinuationToken"] = cursor
+
+        async with get_s3_client() as s3:
+            response = await s3.list_objects_v2(**params)
+
+        next_cursor = None
+        if response.get("IsTruncated"):
+            next_cursor = response.get("NextContinuationToken")
+        return self._entries(response, prefix), next_cursor
+
+    async def list_files(
+        self, bucket_name: str = None, directory: str = None
+    ) -> dict[str, str]:
+        return {
+            entry["name"]: entry["type"]
+            async for entry in self.iter_entries(
+                bucket_name=bucket_name, directory=directory
+            )
+        }
 
     async def download_file(self, key: str, bucket_name: str = None) -> bytes:
-        if bucket_name:
-            self.bucket_name = bucket_name
+        bucket = bucket_name or self.bucket_name
         async with get_s3_client() as s3:
-            obj = await s3.get_object(Bucket=self.bucket_name, Key=key)
+            obj = await s3.get_object(Bucket=bucket, Key=key)
             content = await obj["Body"].read()
             return content
 
+    async def open_file(
+        self,
+        key: str,
+        bucket_name: str = None,
+        byte_range: str = None,
+        if_none_match: str = None,
+    ) -> StoredObject:
+        """
+        Открывает объект на потоковое чтение. byte_range ("bytes=0-1023")
+        и if_none_match передаются в S3 как есть: S3 сам отдаёт нужный
+        диапазон или отвечает 304, если ETag совпал.
+        """
+        bucket = bucket_name or self.bucket_name
+
+        params = {"Bucket": bucket, "Key": key}
+        if byte_range:
+            params["Range"] = byte_range
+        if if_none_match:
+            params["IfNoneMatch"] = if_none_match
+
+        async with get_s3_client() as s3:
+            try:
+                obj = await s3.get_object(**params)
+            except ClientError as e:
+                metadata = e.response.get("ResponseMetadata", {})
+                if metadata.get("HTTPStatusCode") == 304:
+                    return StoredObject(
+                        etag=metadata.get("HTTPHeaders", {}).get("etag"),
+                        not_modified=True,
+                    )
+                raise
+
+        return StoredObject(
+            etag=obj.get("ETag"),
+            content_length=obj.get("ContentLength"),
+            content_range=obj.get("ContentRange"),
+            content_type=obj.get("ContentType"),
+            last_modified=obj.get("LastModified"),
+            body=obj["Body"],
+        )
+
     async def delete_file(self, key: str, bucket_name: str = None):
-        if bucket_name:
-            self.bucket_name = bucket_name
+        bucket = bucket_name or self.bucket_name
         async with get_s3_client() as s3:
-            await s3.delete_object(Bucket=self.bucket_name, Key=key)
+            await s3.delete_object(Bucket=bucket, Key=key)
+
+    @staticmethod
+    async def _copy_verified(s3, bucket: str, src_key: str, dest_key: str):
+        """
+        Копирует объект на стороне S3 и сверяет копию с исходником по ETag.
+        CopySourceIfMatch гарантирует, что скопирована именно проверенная
+        версия, даже если исходник успели перезаписать.
+        """
+        try:
+            source = await s3.head_object(Bucket=bucket, Key=src_key)
+        except ClientError:
+            raise ValueError(f"Source file '{src_key}' does not exist")
+
+        source_etag = source["ETag"]
+        try:
+            copied = await s3.copy_object(
+                Bucket=bucket,
+                CopySource={"Bucket": bucket, "Key": src_key},
+                CopySourceIfMatch=source_etag,
+                Key=dest_key,
+            )
+        except ClientError as e:
+            raise RuntimeError(f"Failed to copy file: {e}")
+
+        if copied["CopyObjectResult"]["ETag"] == source_etag:
+            return
+
+        # ETag составного (multipart) объекта не MD5 содержимого и после
+        # копирования меняется — для него сверяем размер
+        if "-" in source_etag:
+            dest = await s3.head_object(Bucket=bucket, Key=dest_key)
+            if dest["ContentLength"] == source["ContentLength"]:
+                return
+
+        raise RuntimeError(
+            f"File verification failed after copy: '{src_key}' -> '{dest_key}'"
+        )
 
     async def move_file(
         self, src_key: str, dest_key: str, bucket_name: str = None
     ):
-        if bucket_name:
-            self.bucket_name = bucket_name
+        bucket = bucket_name or self.bucket_name
         async with get_s3_client() as s3:
-            # Проверяем существование исходного файла
-            try:
-                await s3.head_object(Bucket=self.bucket_name, Key=src_key)
-            except ClientError:
-                raise ValueError(f"Source file '{src_key}' does not exist")
-
-            # Копируем файл
-            try:
-                await s3.copy_object(
-                    Bucket=self.bucket_name,
-                    CopySource={"Bucket": self.bucket_name, "Key": src_key},
-                    Key=dest_key,
-                )
-            except ClientError as e:
-                raise RuntimeError(f"Failed to copy file: {e}")
+            await self._copy_verified(s3, bucket, src_key, dest_key)
 
             # Удаляем исходный файл только если копирование прошло успешно
             try:
-                await s3.delete_object(Bucket=self.bucket_name, Key=src_key)
+                await s3.delete_object(Bucket=bucket, Key=src_key)
             except ClientError as e:
                 raise RuntimeError(
                     f"File copied but failed to delete original: {e}"
                 )
+
+    async def move_prefix(
+        self,
+        src_prefix: str,
+        dest_prefix: str,
+        bucket_name: str = None,
+        concurrency: int = None,
+    ) -> dict:
+        """
+        Переносит все объекты с префиксом src_prefix под dest_prefix.
+        Объекты обрабатываются страницами листинга (до 1000 ключей):
+        страница копируется параллельно, не больше concurrency копий
+        одновременно, затем скопированные исходники удаляются одним
+        delete_objects. Исходники, которые не удалось скопировать, остаются
+        на месте и возвращаются в failed.
+        """
+        bucket = bucket_name or self.bucket_name
+        if dest_prefix.startswith(src_prefix):
+            # иначе листинг подхватывал бы только что скопированные объекты
+            raise ValueError("Destination must not be inside the source")
+        slots = asyncio.Semaphore(
+            max(concurrency or settings.S3_COPY_CONCURRENCY, 1)
+        )
+
+        moved = 0
+        failed: dict[str, str] = {}
+        async with get_s3_client() as s3:
+
+            async def copy(key: str) -> str | None:
+                async with slots:
+                    try:
+                        await self._copy_verified(
+                            s3,
+                            bucket,
+                            key,
+                            dest_prefix + key[len(src_prefix):],
+                        )
+                    except (ValueError, RuntimeError) as e:
+                        failed[key] = str(e)
+                        return None
+                    return key
+
+            paginator = s3.get_paginator("list_objects_v2")
+            async for page in paginator.paginate(
+                Bucket=bucket, Prefix=src_prefix
+            ):
+                keys = [obj["Key"] for obj in page.get("Contents", [])]
+                copied = [
+                    key
+                    for key in await asyncio.gather(*(copy(k) for k in keys))
+                    if key is not None
+                ]
+                if not copied:
+                    continue
+
+                response = await s3.delete_objects(
+                    Bucket=bucket,
+                    Delete={
+                        "Objects": [{"Key": key} for key in copied],
+                        "Quiet": True,
+                    },
+                )
+                errors = response.get("Errors", [])
+                for error in errors:
+                    failed[error["Key"]] = (
+                        "File copied but failed to delete original: "
+                        f"{error.get('Message')}"
+                    )
+                moved += len(copied) - len(errors)
+
+        return {"moved": moved, "failed": failed}
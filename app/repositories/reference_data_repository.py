@@ -0,0 +1,57 @@
+from typing import List, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.entities.company_duty import CompanyDutyEntity
+from app.entities.post import PostEntity
+from app.entities.rank import RankEntity
+from app.entities.vigil_enum import VigilEnumEntity
+from app.interfaces.interfaces import IReferenceDataRepository
+from app.models.company_duty_model import CompanyDuty
+from app.models.posts_model import Post
+from app.models.ranks_model import Rank
+from app.models.vigils_enum_model import VigilEnum
+
+
+class ReferenceDataRepository(IReferenceDataRepository):
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def get_all(
+        self,
+    ) -> Tuple[
+        List[VigilEnumEntity],
+        List[RankEntity],
+        List[PostEntity],
+        List[CompanyDutyEntity],
+    ]:
+        vigils = (
+            await self.session.execute(
+                select(VigilEnum).where(VigilEnum.is_deleted.is_(False))
+            )
+        ).scalars().all()
+        ranks = (await self.session.execute(select(Rank))).scalars().all()
+        posts = (await self.session.execute(select(Post))).scalars().all()
+        duties = (
+            await self.session.execute(select(CompanyDuty))
+        ).scalars().all()
+
+        return (
+            [
+                VigilEnumEntity(
+                    id=v.id,
+                    name=v.name,
+                    is_deleted=v.is_deleted,
+                    name_in_csv=v.name_in_csv,
+                    post_in_csv=v.post_in_csv,
+                )
+                for v in vigils
+            ],
+            [
+                RankEntity(id=r.id, name=r.name, short_name=r.short_name)
+                for r in ranks
+            ],
+            [PostEntity(id=p.id, name=p.name) for p in posts],
+            [CompanyDutyEntity(id=d.id, name=d.name) for d in duties],
+        )
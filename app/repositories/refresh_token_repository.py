@@ -0,0 +1,112 @@
+from uuid import UUID
+
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.redis import redis_client
+from app.exceptions.exceptions import InvalidRefreshTokenError
+from app.interfaces.interfaces import IRefreshTokenStore
+from app.models.refresh_token_model import RefreshToken
+
+# Атомарная замена токена: меняем только если в Redis лежит именно старый.
+# 1 — заменили, 0 — токен другой (отозван), -1 — токена нет.
+_ROTATE_SCRIPT = """
+local current = redis.call('GET', KEYS[1])
+if not current then
+    return -1
+end
+if current ~= ARGV[1] then
+    return 0
+end
+redis.call('SET', KEYS[1], ARGV[2], 'EX', ARGV[3])
+return 1
+"""
+
+
+class RedisRefreshTokenStore(IRefreshTokenStore):
+    """Хранит по одному refresh-токену на пользователя с TTL = сроку жизни токена."""
+
+    KEY_PREFIX = "refresh_token:"
+
+    def __init__(self, client=redis_client):
+        self.client = client
+        self.ttl = settings.REFRESH_TOKEN_EXPIRE_DAYS * 24 * 60 * 60
+        self._rotate = client.register_script(_ROTATE_SCRIPT)
+
+    def _key(self, user_id: UUID) -> str:
+        return f"{self.KEY_PREFIX}{user_id}"
+
+    async def save(self, user_id: UUID, refresh_token: str) -> None:
+        await self.client.set(self._key(user_id), refresh_token, ex=self.ttl)
+
+    async def get(self, user_id: UUID) -> str | None:
+        token = await self.client.get(self._key(user_id))
+        return token.decode() if token else None
+
+    async def rotate(
+        self, user_id: UUID, old_token: str, new_token: str
+    ) -> None:
+        result = await self._rotate(
+            keys=[self._key(user_id)], args=[old_token, new_token, self.ttl]
+        )
+        if result == -1:
+            raise InvalidRefreshTokenError("Refresh token not found")
+        if result == 0:
+            raise InvalidRefreshTokenError("Refresh token revoked")
+
+
+class SqlRefreshTokenStore(IRefreshTokenStore):
+    """Запасной вариант на таблице refresh_tokens."""
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def save(self, user_id: UUID, refresh_token: str) -> None:
+        stmt = select(RefreshToken).where(RefreshToken.user_id == user_id)
+        existing = (await self.session.execute(stmt)).scalar_one_or_none()
+
+        if existing:
+            existing.token = refresh_token
+        else:
+            self.session.add(
+                RefreshToken(user_id=user_id, token=refresh_token)
+            )
+
+        await self.session.commit()
+
+    async def get(self, user_id: UUID) -> str | None:
+        stmt = select(RefreshToken.token).where(
+            RefreshToken.user_id == user_id
+        )
+        return (await self.session.execute(stmt)).scalar_one_or_none()
+
+    async def rotate(
+        self, user_id: UUID, old_token: str, new_token: str
+    ) -> None:
+        # сравнение и замена одним UPDATE, без предварительного SELECT
+        stmt = (
+            update(RefreshToken)
+            .where(
+                RefreshToken.user_id == user_id,
+                RefreshToken.token == old_token,
+            )
+            .values(token=new_token)
+            .returning(RefreshToken.id)
+        )
+        rotated = (await self.session.execute(stmt)).scalar_one_or_none()
+        await self.session.commit()
+
+        if rotated is None:
+            if await self.get(user_id) is None:
+                raise InvalidRefreshTokenError("Refresh token not found")
+            raise InvalidRefreshTokenError("Refresh token revoked")
+
+
+redis_refresh_token_store = RedisRefreshTokenStore()
+
+
+def get_refresh_token_store(session: AsyncSession) -> IRefreshTokenStore:
+    if settings.REFRESH_TOKEN_STORE == "redis":
+        return redis_refresh_token_store
+    return SqlRefreshTokenStore(session)
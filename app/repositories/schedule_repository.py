@@ -1,17 +1,74 @@
+import uuid
 from uuid import UUID
 
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_
+from sqlalchemy import DATE, Integer, Row, cast, select, and_, delete, func, insert
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlalchemy.exc import IntegrityError, SQLAlchemyError
-from datetime import datetime
-from typing import List
+from collections import Counter
+from datetime import date, datetime
+from typing import AsyncIterator, List, Sequence, Tuple
 
+from app.entities.decoded_vigils import DecodedVigils
 from app.entities.vigil_enum import VigilEnumEntity
 from app.interfaces.interfaces import IScheduleRepository
 from app.models.vigils_enum_model import VigilEnum
 from app.models.schedule_gc_model import ScheduleGC
 from app.models.schedule_vigil_model import ScheduleVigil
-from app.exceptions.exceptions import VigilsTypeNotFound
+from app.models.schedule_vigil_stats_model import ScheduleVigilStats
+
+
+def _diff(existing, wanted: set) -> tuple[list, list, int]:
+    """
+    existing: пары (id строки, ключ) из БД, wanted: ключи из загружаемого графика.
+    Возвращает id строк на удаление (лишние и дубли), ключи на вставку и число
+    строк, оставшихся без изменений.
+    """
+    kept = set()
+    to_delete = []
+    for row_id, key in existing:
+        if key in wanted and key not in kept:
+            kept.add(key)
+        else:
+            to_delete.append(row_id)
+    return to_delete, [key for key in wanted if key not in kept], len(kept)
+
+
+# asyncpg ограничивает число параметров в запросе (32767)
+_DELETE_CHUNK = 10_000
+
+
+# ключ pg_advisory_xact_lock для публикации графика
+_PUBLISH_LOCK_KEY = 7_301_001
+
+
+def _count_stats(stats_delta: Counter, keys, sign: int):
+    """keys: (user_id, date, vigil_id) добавленных или удаленных нарядов."""
+    for user_id, day, vigil_id in keys:
+        month = day.date().replace(day=1)
+        stats_delta[(month, user_id, vigil_id, day.weekday())] += sign
+
+
+def _summary(inserted: int, deleted: int, unchanged: int) -> dict:
+    return {"inserted": inserted, "deleted": deleted, "unchanged": unchanged}
+
+
+def _filter_vigils(stmt, start_at, end_at, user_ids, vigil_ids, ignore_id):
+    if vigil_ids:
+        if ignore_id in vigil_ids:
+            vigil_ids.remove(ignore_id)
+
+    if start_at:
+        stmt = stmt.where(ScheduleVigil.date >= start_at)
+    if end_at:
+        stmt = stmt.where(ScheduleVigil.date <= end_at)
+    if user_ids:
+        stmt = stmt.where(ScheduleVigil.user_id.in_(user_ids))
+    if vigil_ids:
+        stmt = stmt.where(ScheduleVigil.vigil_id.in_(vigil_ids))
+    elif ignore_id:
+        stmt = stmt.where(ScheduleVigil.vigil_id != ignore_id)
+    return stmt
 
 
 class ScheduleRepository(IScheduleRepository):
@@ -26,96 +83,266 @@ class ScheduleRepository(IScheduleRepository):
         vigil_ids: List[UUID] = None,
         ignore_id: int = None,
     ):
-        if vigil_ids:
-            if ignore_id in vigil_ids:
-                vigil_ids.remove(ignore_id)
-
-        stmt = select(ScheduleVigil)
-        if start_at:
-            stmt = stmt.where(ScheduleVigil.date >= start_at)
-        if end_at:
-            stmt = stmt.where(ScheduleVigil.date <= end_at)
-        if user_ids:
-            stmt = stmt.where(ScheduleVigil.user_id.in_(user_ids))
-        if vigil_ids:
-            stmt = stmt.where(ScheduleVigil.vigil_id.in_(vigil_ids))
-        elif ignore_id:
-            stmt = stmt.where(ScheduleVigil.vigil_id != ignore_id)
-
+        stmt = _filter_vigils(
+            select(ScheduleVigil), start_at, end_at, user_ids, vigil_ids, ignore_id
+        )
         result = (await self.session.execute(stmt)).scalars().all()
         return result
 
-    async def save_responsible_schedule(
+    async def stream_vigils(
+        self,
+        start_at: datetime = None,
+        end_at: datetime = None,
+        user_ids: List[UUID] = None,
+        vigil_ids: List[UUID] = None,
+        ignore_id: UUID = None,
+        batch_size: int = 5000,
+    ) -> AsyncIterator[Sequence[Row]]:
+        """
+        Наряды пачками строк (date, user_id, vigil_id) с серверного курсора,
+        без создания ORM-объектов и без загрузки всей выборки в память.
+        """
+        stmt = _filter_vigils(
+            select(
+                ScheduleVigil.date, ScheduleVigil.user_id, ScheduleVigil.vigil_id
+            ),
+            start_at,
+            end_at,
+            user_ids,
+            vigil_ids,
+            ignore_id,
+        ).order_by(ScheduleVigil.date)
+
+        result = await self.session.stream(
+            stmt.execution_options(yield_per=batch_size)
+        )
+        async for rows in result.partitions():
+            yield rows
+
+    async def get_calendar(
+        self, start_at: datetime, end_at: datetime
+    ) -> Tuple[List[Row], List[datetime]]:
+        """
+        Наряды за [start_at, end_at), сгруппированные в БД по дню и типу
+        наряда: (date, vigil_id, [user_id, ...]). Плюс даты группы контроля.
+        """
+        stmt = (
+            select(
+                ScheduleVigil.date,
+                ScheduleVigil.vigil_id,
+                func.array_agg(ScheduleVigil.user_id).label("user_ids"),
+            )
+            .where(
+                ScheduleVigil.date >= start_at, ScheduleVigil.date < end_at
+            )
+            .group_by(ScheduleVigil.date, ScheduleVigil.vigil_id)
+            .order_by(ScheduleVigil.date)
+        )
+        vigils = (await self.session.execute(stmt)).all()
+
+        stmt = (
+            select(ScheduleGC.date)
+            .where(ScheduleGC.date >= start_at, ScheduleGC.date < end_at)
+            .order_by(ScheduleGC.date)
+        )
+        group_control = (await self.session.execute(stmt)).scalars().all()
+        return vigils, group_control
+
+    async def _sync_responsible(
         self,
-        responsible: dict[str, int],
+        responsible: dict[str, UUID],
         start_date: datetime,
         end_date: datetime,
-    ):
+        responsible_vigil_id: UUID,
+        stats_delta: Counter,
+    ) -> dict:
         """
-        Метод для загрузки данных об графике ответственных в БД, предварительно удалив старые данные для предостережения от пересечений
+        Приводит график ответственных за период к загружаемому:
+        сравнивает с сохраненным и применяет только разницу.
         """
-        try:
-            stmt = select(VigilEnum).where(VigilEnum.is_deleted.is_(False))
-            result = (await self.session.execute(stmt)).scalars().all()
-
-            if not result:
-                raise VigilsTypeNotFound("В БД отсутствуют типы дежурств")
-
-            vigil_resp_id = next(
-                (v.id for v in result if v.name == "Ответственный"), None
+        stmt = select(
+            ScheduleVigil.id, ScheduleVigil.user_id, ScheduleVigil.date
+        ).where(
+            and_(
+                ScheduleVigil.date.between(start_date, end_date),
+                ScheduleVigil.vigil_id == responsible_vigil_id,
             )
-            if not vigil_resp_id:
-                raise VigilsTypeNotFound(
-                    "В БД отсутствуют тип дежурства 'Ответственный'"
-                )
-
-            stmt = select(ScheduleVigil).where(
-                and_(
-                    ScheduleVigil.date.between(start_date, end_date),
-                    ScheduleVigil.vigil_id == vigil_resp_id,
-                )
+        )
+        existing = (await self.session.execute(stmt)).all()
+
+        existing = [(r.id, (r.user_id, r.date)) for r in existing]
+        to_delete, to_insert, unchanged = _diff(
+            existing,
+            {
+                (user_id, datetime.strptime(date, "%d-%m-%Y"))
+                for date, user_id in responsible.items()
+            },
+        )
+        await self._delete_by_ids(ScheduleVigil, to_delete)
+        await self._bulk_insert_vigils(
+            [
+                (uuid.uuid4(), date, responsible_vigil_id, user_id)
+                for user_id, date in to_insert
+            ]
+        )
+
+        deleted = set(to_delete)
+        _count_stats(
+            stats_delta,
+            (
+                (user_id, date, responsible_vigil_id)
+                for row_id, (user_id, date) in existing
+                if row_id in deleted
+            ),
+            -1,
+        )
+        _count_stats(
+            stats_delta,
+            ((user_id, date, responsible_vigil_id) for user_id, date in to_insert),
+            1,
+        )
+        return _summary(len(to_insert), len(to_delete), unchanged)
+
+    async def _sync_group_control(
+        self, group_control_schedule: list, start_date, end_date
+    ) -> dict:
+        """
+        Приводит график группы контроля за период к загружаемому:
+        удаляет только даты, которых больше нет в графике, и добавляет новые.
+        """
+        stmt = select(ScheduleGC.id, ScheduleGC.date).where(
+            ScheduleGC.date.between(start_date, end_date)
+        )
+        existing = (await self.session.execute(stmt)).all()
+
+        to_delete, to_insert, unchanged = _diff(
+            ((r.id, r.date) for r in existing), set(group_control_schedule)
+        )
+        await self._delete_by_ids(ScheduleGC, to_delete)
+        if to_insert:
+            await self.session.execute(
+                insert(ScheduleGC),
+                [{"id": uuid.uuid4(), "date": d} for d in sorted(to_insert)],
             )
-            existing = (await self.session.execute(stmt)).scalars().all()
+        return _summary(len(to_insert), len(to_delete), unchanged)
 
-            for ev in existing:
-                await self.session.delete(ev)
-
-            for date, user_id in responsible.items():
-                schedule = ScheduleVigil(
-                    date=datetime.strptime(date, "%d-%m-%Y"),
-                    user_id=user_id,
-                    vigil_id=vigil_resp_id,
-                )
-                self.session.add(schedule)
-
-            await self.session.commit()
-
-        except (IntegrityError, SQLAlchemyError) as e:
-            await self.session.rollback()
-            raise e
-        except Exception as e:
-            await self.session.rollback()
-            raise e
+    async def _delete_by_ids(self, model, ids: List[UUID]):
+        for i in range(0, len(ids), _DELETE_CHUNK):
+            await self.session.execute(
+                delete(model).where(model.id.in_(ids[i : i + _DELETE_CHUNK]))
+            )
 
-    async def save_group_control_schedule(
-        self, group_control_schedule: list, start_date, end_date
-    ):
+    async def _bulk_insert_vigils(self, rows: List[tuple]):
         """
-        Сохраняет записи графика группы контроля.
-        Сначала удаляет старые записи за период, затем добавляет новые.
+        Вставка строк (id, date, vigil_id, user_id) в schedule_vigil в текущей транзакции.
+        Для asyncpg используется COPY, для остальных драйверов — многострочный INSERT.
         """
-        try:
-            stmt = select(ScheduleGC).where(
-                ScheduleGC.date.between(start_date, end_date)
+        if not rows:
+            return
+
+        conn = await self.session.connection()
+        if conn.dialect.driver == "asyncpg":
+            raw = await conn.get_raw_connection()
+            await raw.driver_connection.copy_records_to_table(
+                ScheduleVigil.__tablename__,
+                records=rows,
+                columns=["id", "date", "vigil_id", "user_id"],
+            )
+        else:
+            await self.session.execute(
+                insert(ScheduleVigil),
+                [
+                    {"id": r[0], "date": r[1], "vigil_id": r[2], "user_id": r[3]}
+                    for r in rows
+                ],
             )
-            result = (await self.session.execute(stmt)).scalars().all()
-            for gc in result:
-                await self.session.delete(gc)
 
-            for gc_date in group_control_schedule:
-                self.session.add(ScheduleGC(date=gc_date))
+    async def _sync_vigils(
+        self,
+        vigils: DecodedVigils,
+        start_date: datetime,
+        end_date: datetime,
+        responsible_vigil_id: UUID,
+        stats_delta: Counter,
+    ) -> dict:
+        """
+        Приводит наряды за период (кроме ответственных) к разобранному графику:
+        удаляются только исчезнувшие записи и вставляются только новые.
+        """
+        stmt = select(
+            ScheduleVigil.id,
+            ScheduleVigil.user_id,
+            ScheduleVigil.date,
+            ScheduleVigil.vigil_id,
+        ).where(
+            and_(
+                ScheduleVigil.date.between(start_date, end_date),
+                ScheduleVigil.vigil_id != responsible_vigil_id,
+            )
+        )
+        existing = (await self.session.execute(stmt)).all()
+
+        existing = [(r.id, (r.user_id, r.date, r.vigil_id)) for r in existing]
+        to_delete, to_insert, unchanged = _diff(existing, set(zip(*vigils)))
+        await self._delete_by_ids(ScheduleVigil, to_delete)
+        await self._bulk_insert_vigils(
+            [
+                (uuid.uuid4(), date, vigil_id, user_id)
+                for user_id, date, vigil_id in to_insert
+            ]
+        )
+
+        deleted = set(to_delete)
+        _count_stats(
+            stats_delta,
+            (key for row_id, key in existing if row_id in deleted),
+            -1,
+        )
+        _count_stats(stats_delta, to_insert, 1)
+        return _summary(len(to_insert), len(to_delete), unchanged)
+
+    async def publish_schedule(
+        self,
+        group_control: list,
+        group_control_period: tuple[datetime, datetime],
+        responsible: dict[str, UUID],
+        responsible_period: tuple[datetime, datetime],
+        vigils: DecodedVigils,
+        vigils_period: tuple[datetime, datetime],
+        responsible_vigil_id: UUID,
+    ) -> dict:
+        """
+        Публикует загруженный график целиком в одной транзакции: графики группы
+        контроля, ответственных и нарядов применяются к таблицам и фиксируются
+        одним commit. Читатели видят либо прежний месяц, либо новый целиком.
+        Периоды — (start_date, end_date), которые график полностью покрывает.
+        """
+        try:
+            conn = await self.session.connection()
+            if conn.dialect.name == "postgresql":
+                # параллельные импорты с разных воркеров выполняются по очереди
+                await self.session.execute(
+                    select(func.pg_advisory_xact_lock(_PUBLISH_LOCK_KEY))
+                )
 
+            stats_delta = Counter()
+            changes = {
+                "group_control": await self._sync_group_control(
+                    group_control, *group_control_period
+                ),
+                "responsible": await self._sync_responsible(
+                    responsible,
+                    *responsible_period,
+                    responsible_vigil_id,
+                    stats_delta,
+                ),
+                "vigils": await self._sync_vigils(
+                    vigils, *vigils_period, responsible_vigil_id, stats_delta
+                ),
+            }
+            await self._apply_stats_delta(stats_delta)
             await self.session.commit()
+            return changes
 
         except IntegrityError as e:
             await self.session.rollback()
@@ -127,157 +354,108 @@ class ScheduleRepository(IScheduleRepository):
             await self.session.rollback()
             raise e
 
-    async def save_vigils_schedule(
-        self, vigils_schedule: dict, start_date: datetime, end_date: datetime
-    ):
-        try:
-            stmt = select(VigilEnum).where(VigilEnum.is_deleted.is_(False))
-            vigils_types = (await self.session.execute(stmt)).scalars().all()
-
-            if not vigils_types:
-                raise VigilsTypeNotFound("В БД отсутствуют типы дежурств")
-
-            vigil_resp_id = next(
-                (v.id for v in vigils_types if v.name == "Ответственный"), None
+    async def _apply_stats_delta(self, stats_delta: Counter):
+        """Прибавляет изменения импорта к свертке schedule_vigil_stats."""
+        rows = [
+            {
+                "month": month,
+                "user_id": user_id,
+                "vigil_id": vigil_id,
+                "weekday": weekday,
+                "count": delta,
+            }
+            for (month, user_id, vigil_id, weekday), delta in stats_delta.items()
+            if delta
+        ]
+        if not rows:
+            return
+
+        stmt = pg_insert(ScheduleVigilStats)
+        await self.session.execute(
+            stmt.on_conflict_do_update(
+                index_elements=["month", "user_id", "vigil_id", "weekday"],
+                set_={"count": ScheduleVigilStats.count + stmt.excluded.count},
+            ),
+            rows,
+        )
+        await self.session.execute(
+            delete(ScheduleVigilStats).where(
+                ScheduleVigilStats.month.in_({r["month"] for r in rows}),
+                ScheduleVigilStats.count <= 0,
             )
-            if not vigil_resp_id:
-                raise VigilsTypeNotFound(
-                    "В БД отсутствуют тип дежурства 'Ответственный'"
-                )
+        )
 
-            stmt = select(ScheduleVigil).where(
-                and_(
-                    ScheduleVigil.date.between(start_date, end_date),
-                    ScheduleVigil.vigil_id != vigil_resp_id,
-                )
+    async def get_stats(
+        self,
+        start_month: date,
+        end_month: date,
+        user_ids: List[UUID] = None,
+        vigil_ids: List[UUID] = None,
+    ) -> List[Row]:
+        """(user_id, vigil_id, weekday, count) из свертки за месяцы [start_month, end_month]."""
+        stmt = (
+            select(
+                ScheduleVigilStats.user_id,
+                ScheduleVigilStats.vigil_id,
+                ScheduleVigilStats.weekday,
+                func.sum(ScheduleVigilStats.count).label("count"),
             )
-            old_vigils = (await self.session.execute(stmt)).scalars().all()
-
-            for v in old_vigils:
-                await self.session.delete(v)
-
-            for user_id, user_data in vigils_schedule.items():
-                user_excel_position = user_data.get("position")
-                user_excel_schedule = user_data.get("schedule")
-
-                for date_str, user_excel_vigil in user_excel_schedule.items():
-                    if not user_excel_vigil or user_excel_vigil == "-":
-                        continue
-
-                    temp_str = user_excel_vigil
-                    if "ЗН Р" in temp_str:
-                        temp_str = temp_str.replace("ЗН Р", "")
-
-                        for item in vigils_types:
-                            if (
-                                item.name_in_csv == "ЗН Р"
-                                and item.post_in_csv == user_excel_position
-                            ):
-                                schedule = ScheduleVigil(
-                                    date=datetime.strptime(
-                                        date_str, "%Y-%m-%d"
-                                    ),
-                                    user_id=user_id,
-                                    vigil_id=item.id,
-                                )
-                                self.session.add(schedule)
-                                break
-
-                    if "РГ" in temp_str:
-                        temp_str = temp_str.replace("РГ", "")
-
-                        for item in vigils_types:
-                            if item.name_in_csv == "РГ":
-                                schedule = ScheduleVigil(
-                                    date=datetime.strptime(
-                                        date_str, "%Y-%m-%d"
-                                    ),
-                                    user_id=user_id,
-                                    vigil_id=item.id,
-                                )
-                                self.session.add(schedule)
-                                break
-
-                    if "Р" in temp_str:
-                        temp_str = temp_str.replace("Р", "")
-
-                        for item in vigils_types:
-                            if (
-                                item.name_in_csv == "Р"
-                                and item.post_in_csv == user_excel_position
-                            ):
-                                schedule = ScheduleVigil(
-                                    date=datetime.strptime(
-                                        date_str, "%Y-%m-%d"
-                                    ),
-                                    user_id=user_id,
-                                    vigil_id=item.id,
-                                )
-                                self.session.add(schedule)
-                                break
-
-                    if "ЗН ДТП" in temp_str:
-                        temp_str = temp_str.replace("ЗН ДТП", "")
-
-                        for item in vigils_types:
-                            if item.name_in_csv == "ЗН ДТП":
-                                schedule = ScheduleVigil(
-                                    date=datetime.strptime(
-                                        date_str, "%Y-%m-%d"
-                                    ),
-                                    user_id=user_id,
-                                    vigil_id=item.id,
-                                )
-                                self.session.add(schedule)
-                                break
-
-                    if "ДТП" in temp_str:
-                        temp_str = temp_str.replace("ДТП", "")
-
-                        for item in vigils_types:
-                            if item.name_in_csv == "ДТП":
-                                schedule = ScheduleVigil(
-                                    date=datetime.strptime(
-                                        date_str, "%Y-%m-%d"
-                                    ),
-                                    user_id=user_id,
-                                    vigil_id=item.id,
-                                )
-                                self.session.add(schedule)
-                                break
-
-                    for item in vigils_types:
-                        if item.name_in_csv in temp_str:
-                            temp_str = temp_str.replace(item.name_in_csv, "")
-                            schedule = ScheduleVigil(
-                                date=datetime.strptime(date_str, "%Y-%m-%d"),
-                                user_id=user_id,
-                                vigil_id=item.id,
-                            )
-                            self.session.add(schedule)
-
-            await self.session.commit()
-
-        except IntegrityError as e:
-            await self.session.rollback()
-            raise e
-        except SQLAlchemyError as e:
-            await self.session.rollback()
-            raise e
-        except Exception as e:
-            await self.session.rollback()
-            raise e
-
-    async def get_vigils_type(self, name: List[str] = None):
-        stmt = select(VigilEnum).where(VigilEnum.is_deleted.is_(False))
-        if name:
-            stmt = stmt.where(VigilEnum.name.in_(name))
-        result = (await self.session.execute(stmt)).scalars().all()
-        if not result:
-            raise VigilsTypeNotFound(
-                "Vigils type not added in db, maybe you not run utils route to create base working data"
+            .where(ScheduleVigilStats.month.between(start_month, end_month))
+            .group_by(
+                ScheduleVigilStats.user_id,
+                ScheduleVigilStats.vigil_id,
+                ScheduleVigilStats.weekday,
             )
-        return result
+        )
+        if user_ids:
+            stmt = stmt.where(ScheduleVigilStats.user_id.in_(user_ids))
+        if vigil_ids:
+            stmt = stmt.where(ScheduleVigilStats.vigil_id.in_(vigil_ids))
+        return (await self.session.execute(stmt)).all()
+
+    async def get_longest_streaks(
+        self,
+        start_at: datetime,
+        end_at: datetime,
+        user_ids: List[UUID] = None,
+        vigil_ids: List[UUID] = None,
+    ) -> dict[UUID, int]:
+        """
+        Самая длинная серия дней подряд с нарядом для каждого пользователя
+        за [start_at, end_at). Считается в БД методом «gaps and islands»
+        по индексу (user_id, date).
+        """
+        days = select(
+            ScheduleVigil.user_id, cast(ScheduleVigil.date, DATE).label("day")
+        ).where(ScheduleVigil.date >= start_at, ScheduleVigil.date < end_at)
+        if user_ids:
+            days = days.where(ScheduleVigil.user_id.in_(user_ids))
+        if vigil_ids:
+            days = days.where(ScheduleVigil.vigil_id.in_(vigil_ids))
+        days = days.distinct().subquery()
+
+        # у дней одной серии разность «день - номер по порядку» одинакова
+        islands = select(
+            days.c.user_id,
+            (
+                days.c.day
+                - cast(
+                    func.row_number().over(
+                        partition_by=days.c.user_id, order_by=days.c.day
+                    ),
+                    Integer,
+                )
+            ).label("island"),
+        ).subquery()
+        lengths = (
+            select(islands.c.user_id, func.count().label("length"))
+            .group_by(islands.c.user_id, islands.c.island)
+            .subquery()
+        )
+        stmt = select(lengths.c.user_id, func.max(lengths.c.length)).group_by(
+            lengths.c.user_id
+        )
+        return dict((await self.session.execute(stmt)).all())
 
     async def create_vigils_type(
         self, data: List[VigilEnumEntity]
@@ -1,10 +1,12 @@
+import base64
+import binascii
 from datetime import datetime
-from typing import List
+from typing import List, Tuple
 from uuid import UUID
 
-from sqlalchemy import select
+from sqlalchemy import select, or_, tuple_
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import selectinload
+from sqlalchemy.orm import noload, selectinload
 from sqlalchemy import and_
 
 from app.entities.task import TaskEntity
@@ -13,10 +15,25 @@ from app.entities.user import UserEntity, OnlyUserEntity
 from app.exceptions.exceptions import TaskNotFound
 from app.interfaces.interfaces import ITaskRepository
 from app.models import User
+from app.models.association_tables import associate_task_responsibles
 from app.models.attachment_model import Attachment
 from app.models.task_model import Task
 
 
+def encode_task_cursor(created_at: datetime, task_id: UUID) -> str:
+    raw = f"{created_at.isoformat()}|{task_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode()
+
+
+def decode_task_cursor(cursor: str) -> Tuple[datetime, UUID]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode()).decode()
+        created_at, task_id = raw.split("|", 1)
+        return datetime.fromisoformat(created_at), UUID(task_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise ValueError("Invalid cursor")
+
+
 class TaskRepository(ITaskRepository):
     def __init__(self, session: AsyncSession):
         self.session = session
@@ -222,18 +239,78 @@ class TaskRepository(ITaskRepository):
     async def get(
         self,
         task_ids: List[UUID] = None,
-        responsible_id: UUID = None
-    ) -> List[TaskEntity]:
-
-        stmt = select(Task)
+        responsible_id: UUID = None,
+        owner_id: UUID = None,
+        status: str = None,
+        expired_from: datetime = None,
+        expired_to: datetime = None,
+        cursor: str = None,
+        limit: int = 50,
+    ) -> Tuple[List[TaskEntity], str | None]:
+        """
+        Список задач с фильтрами и keyset-пагинацией по (created_at, id).
+        Возвращает страницу задач и курсор следующей страницы (None если это последняя).
+        """
+        stmt = select(Task).options(
+            # у User связи с задачами lazy="selectin" — без noload подтянутся все задачи владельца
+            selectinload(Task.owner_user).options(
+                noload(User.owned_tasks), noload(User.responsible_tasks)
+            ),
+            selectinload(Task.responsible).options(
+                noload(User.owned_tasks), noload(User.responsible_tasks)
+            ),
+            selectinload(Task.attachments),
+        )
 
         if task_ids:
-            stmt.where(Task.id.in_(task_ids))
+            stmt = stmt.where(Task.id.in_(task_ids))
         if responsible_id:
-            stmt.where(Task.responsible.any(User.id == responsible_id))
+            stmt = stmt.where(
+                Task.id.in_(
+                    select(associate_task_responsibles.c.task_id).where(
+                        associate_task_responsibles.c.user_id == responsible_id
+                    )
+                )
+            )
+        if owner_id:
+            stmt = stmt.where(Task.owner_id == owner_id)
+
+        now = datetime.now()
+        if status == "deleted":
+            stmt = stmt.where(Task.deleted_at.is_not(None))
+        else:
+            stmt = stmt.where(Task.deleted_at.is_(None))
+            if status == "expired":
+                stmt = stmt.where(Task.expired_at < now)
+            elif status == "in_progress":
+                stmt = stmt.where(
+                    or_(Task.expired_at.is_(None), Task.expired_at >= now)
+                )
 
+        if expired_from:
+            stmt = stmt.where(Task.expired_at >= expired_from)
+        if expired_to:
+            stmt = stmt.where(Task.expired_at <= expired_to)
+
+        if cursor:
+            created_at, task_id = decode_task_cursor(cursor)
+            stmt = stmt.where(
+                tuple_(Task.created_at, Task.id) < (created_at, task_id)
+            )
+
+        # берем на одну запись больше, чтобы понять, есть ли следующая страница
+        stmt = stmt.order_by(Task.created_at.desc(), Task.id.desc()).limit(
+            limit + 1
+        )
         result = (await self.session.execute(stmt)).scalars().all()
 
+        next_cursor = None
+        if len(result) > limit:
+            result = result[:limit]
+            next_cursor = encode_task_cursor(
+                result[-1].created_at, result[-1].id
+            )
+
         return [TaskEntity(
             id=t.id,
             text=t.text,
@@ -260,10 +337,11 @@ class TaskRepository(ITaskRepository):
             expired_at=t.expired_at,
             created_at=t.created_at,
             updated_at=t.updated_at,
+            deleted_at=t.deleted_at,
             attachments=[AttachmentEntity(
                 id=a.id,
                 filename=a.filename,
                 file_path=a.file_path,
             ) for a in t.attachments]
         )
-                for t in result]
\ No newline at end of file
+                for t in result], next_cursor
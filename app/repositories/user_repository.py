@@ -1,7 +1,7 @@
 from typing import List
 from uuid import UUID
 
-from sqlalchemy import select, or_
+from sqlalchemy import func, select, or_
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import selectinload
 
@@ -14,14 +14,73 @@ from app.entities.company_duty import CompanyDutyEntity
 from app.exceptions.exceptions import UserAlreadyExistsError, UserNotFoundError
 from app.interfaces.interfaces import IUserRepository
 from app.models import Project
+from app.models.association_tables import (
+    associate_users_duties,
+    associate_users_projects,
+)
 from app.models.posts_model import Post
-from app.models.refresh_token_model import RefreshToken
 from app.models.user_model import User
 from app.models.company_duty_model import CompanyDuty
 from app.models.ranks_model import Rank
 from app.logger.logger import logger
 
 
+def _user_projection():
+    """
+    Только колонки пользователя и массивы id обязанностей/проектов,
+    без загрузки ORM-графа (звание, должность, задачи).
+    """
+    duty_ids = (
+        select(func.array_agg(associate_users_duties.c.duty_id))
+        .where(associate_users_duties.c.user_id == User.id)
+        .correlate(User)
+        .scalar_subquery()
+    )
+    project_ids = (
+        select(func.array_agg(associate_users_projects.c.project_id))
+        .where(associate_users_projects.c.user_id == User.id)
+        .correlate(User)
+        .scalar_subquery()
+    )
+    return select(
+        User.id,
+        User.username,
+        User.name,
+        User.surname,
+        User.second_name,
+        User.short_name,
+        User.short_name_2,
+        User.invocation,
+        User.is_superuser,
+        User.is_deleted,
+        User.register_at,
+        User.post_id,
+        User.rank_id,
+        duty_ids.label("duty_ids"),
+        project_ids.label("project_ids"),
+    )
+
+
+def _row_to_entity(row) -> UserEntity:
+    return UserEntity(
+        id=row.id,
+        username=row.username,
+        name=row.name,
+        surname=row.surname,
+        second_name=row.second_name,
+        short_name=row.short_name,
+        short_name_2=row.short_name_2,
+        invocation=row.invocation,
+        is_superuser=row.is_superuser,
+        is_deleted=row.is_deleted,
+        register_at=row.register_at,
+        post_id=row.post_id,
+        rank_id=row.rank_id,
+        duties=[CompanyDutyEntity(id=i) for i in row.duty_ids or []],
+        projects=[ProjectEntity(id=i) for i in row.project_ids or []],
+    )
+
+
 class UserRepository(IUserRepository):
     def __init__(self, session):
         self.session = session
@@ -36,12 +95,7 @@ class UserRepository(IUserRepository):
                   projects_ids: List[UUID]
                   ) -> List[UserEntity]:
 
-        stmt = select(User).options(
-            selectinload(User.rank),
-            selectinload(User.post),
-            selectinload(User.duties),
-            selectinload(User.projects)
-        )
+        stmt = _user_projection()
 
         if ids:
             stmt = stmt.where(User.id.in_(ids))
@@ -59,31 +113,19 @@ class UserRepository(IUserRepository):
             stmt = stmt.where(User.rank_id.in_(rank_ids))
 
         if duties_ids:
-            stmt = stmt.where(User.duties.any(CompanyDuty.id.in_(duties_ids)))
+            stmt = stmt.where(User.id.in_(
+                select(associate_users_duties.c.user_id)
+                .where(associate_users_duties.c.duty_id.in_(duties_ids))
+            ))
 
         if projects_ids:
-            stmt = stmt.where(User.projects.any(Project.id.in_(projects_ids)))
+            stmt = stmt.where(User.id.in_(
+                select(associate_users_projects.c.user_id)
+                .where(associate_users_projects.c.project_id.in_(projects_ids))
+            ))
 
-        results = (await self.session.execute(stmt)).scalars().all()
-
-        return [UserEntity(
-            id=result.id,
-            username=result.username,
-            name=result.name,
-            surname=result.surname,
-            second_name=result.second_name,
-            short_name=result.short_name,
-            short_name_2=result.short_name_2,
-            invocation=result.invocation,
-            hashed_password=result.hashed_password,
-            is_superuser=result.is_superuser,
-            is_deleted=result.is_deleted,
-            register_at=result.register_at,
-            post_id=result.post_id,
-            rank_id=result.rank_id,
-            duties=[CompanyDutyEntity(id=duty.id) for duty in result.duties],
-            projects=[ProjectEntity(id=project.id) for project in result.projects],
-        ) for result in results]
+        rows = (await self.session.execute(stmt)).all()
+        return [_row_to_entity(row) for row in rows]
 
     async def get_superusers(self) -> list[UserEntity] | None:
         stmt = select(User).where(User.is_superuser == True, User.is_deleted == False)
@@ -137,35 +179,18 @@ class UserRepository(IUserRepository):
     async def get_users_from_ids(
         self, user_id: List[UUID] = None
     ) -> list[UserEntity]:
-        stmt = select(User).options(
-            selectinload(User.rank),
-            selectinload(User.post),
-            selectinload(User.duties),
-            selectinload(User.projects),
-            selectinload(User.responsible_tasks),
-        )
+        stmt = _user_projection()
         if user_id:
             stmt = stmt.where(User.id.in_(user_id))
-        result = (await self.session.execute(stmt)).scalars().all()
-        return [UserEntity(
-            id=user.id,
-            username=user.username,
-            name=user.name,
-            surname=user.surname,
-            second_name=user.second_name,
-            short_name=user.short_name,
-            short_name_2=user.short_name_2,
-            invocation=user.invocation,
-            hashed_password=user.hashed_password,
-            is_superuser=user.is_superuser,
-            is_deleted=user.is_deleted,
-            register_at=user.register_at,
-            post_id=user.post_id,
-            rank_id=user.rank_id,
-            duties=[CompanyDutyEntity(id=duty.id)for duty in user.duties],
-            projects=[ProjectEntity(id=project.id)for project in user.projects],
-            owner_tasks=[TaskEntity(id=task.id)for task in user.owned_tasks],
-            responsible_tasks=[TaskEntity(id=task.id)for task in user.responsible_tasks]) for user in result]
+        rows = (await self.session.execute(stmt)).all()
+        return [_row_to_entity(row) for row in rows]
+
+    async def get_user_names(self) -> List[tuple[UUID, str, str]]:
+        """(id, фамилия, «Фамилия И.О.») активных пользователей для сопоставления с графиком."""
+        stmt = select(User.id, User.surname, User.short_name_2).where(
+            or_(User.is_deleted.is_(False), User.is_deleted.is_(None))
+        )
+        return [tuple(row) for row in (await self.session.execute(stmt)).all()]
 
     async def create_company_duties(
         self, data: List[CompanyDutyEntity]
@@ -288,24 +313,6 @@ class UserRepository(IUserRepository):
             await self.session.rollback()
             raise UserAlreadyExistsError(f"User '{user.username}' already exists")
 
-    async def save_refresh_token(self, user_id: UUID, refresh_token: str):
-        stmt = select(RefreshToken).where(RefreshToken.user_id == user_id)
-        existing = (await self.session.execute(stmt)).scalar_one_or_none()
-
-        if existing:
-            existing.token = refresh_token
-        else:
-            self.session.add(
-                RefreshToken(user_id=user_id, token=refresh_token)
-            )
-
-        await self.session.commit()
-
-    async def get_refresh_token(self, user_id: UUID) -> str | None:
-        stmt = select(RefreshToken).where(RefreshToken.user_id == user_id)
-        token_obj = (await self.session.execute(stmt)).scalar_one_or_none()
-        return token_obj.token if token_obj else None
-
     async def get_by_username(self, username: str) -> UserEntity | None:
         stmt = (
             select(User)
@@ -343,78 +350,17 @@ class UserRepository(IUserRepository):
             responsible_tasks=[TaskEntity(id=task.id)for task in user.responsible_tasks])
 
     async def get_duty_users(self, duty_id: UUID) -> List[UserEntity]:
-        stmt = (
-            select(User)
-            .options(
-                selectinload(User.duties),
-                selectinload(User.rank),
-                selectinload(User.post),
-                selectinload(User.projects),
-                selectinload(User.responsible_tasks),
-            )
-            .where(User.duties.any(CompanyDuty.id == duty_id))
-        )
-        result = (await self.session.execute(stmt)).scalars().all()
-        return (
-            [UserEntity(
-                id=user.id,
-                username=user.username,
-                name=user.name,
-                surname=user.surname,
-                second_name=user.second_name,
-                short_name=user.short_name,
-                short_name_2=user.short_name_2,
-                invocation=user.invocation,
-                hashed_password=user.hashed_password,
-                is_superuser=user.is_superuser,
-                is_deleted=user.is_deleted,
-                register_at=user.register_at,
-                post_id=user.post_id,
-                rank_id=user.rank_id,
-                duties=[CompanyDutyEntity(id=duty.id) for duty in user.duties],
-                projects=[ProjectEntity(id=project.id) for project in user.projects],
-                owner_tasks=[TaskEntity(id=task.id) for task in user.owned_tasks],
-                responsible_tasks=[TaskEntity(id=task.id) for task in user.responsible_tasks])
-            for user in result]
-            if result
-            else []
-        )
+        stmt = _user_projection().where(User.id.in_(
+            select(associate_users_duties.c.user_id)
+            .where(associate_users_duties.c.duty_id == duty_id)
+        ))
+        rows = (await self.session.execute(stmt)).all()
+        return [_row_to_entity(row) for row in rows]
 
     async def get_project_users(self, project_id: UUID) -> List[UserEntity]:
-        stmt = (
-            select(User)
-            .options(
-                selectinload(User.duties),
-                selectinload(User.rank),
-                selectinload(User.post),
-                selectinload(User.projects),
-                selectinload(User.responsible_tasks),
-            )
-            .where(User.projects.any(Project.id == project_id))
-        )
-        result = (await self.session.execute(stmt)).scalars().all()
-        return (
-            [UserEntity(
-                id=user.id,
-                username=user.username,
-                name=user.name,
-                surname=user.surname,
-                second_name=user.second_name,
-                short_name=user.short_name,
-                short_name_2=user.short_name_2,
-                invocation=user.invocation,
-                hashed_password=user.hashed_password,
-                is_superuser=user.is_superuser,
-                is_deleted=user.is_deleted,
-                register_at=user.register_at,
-                post_id=user.post_id,
-                rank_id=user.rank_id,
-                duties=[CompanyDutyEntity(id=duty.id) for duty in user.duties],
-                projects=[ProjectEntity(id=project.id) for project in user.projects],
-                owner_tasks=[TaskEntity(id=task.id) for task in user.owned_tasks],
-                responsible_tasks=[TaskEntity(id=task.id) for task in user.responsible_tasks])
-                for user in result]
-            if result
-            else []
-        )
-
+        stmt = _user_projection().where(User.id.in_(
+            select(associate_users_projects.c.user_id)
+            .where(associate_users_projects.c.project_id == project_id)
+        ))
+        rows = (await self.session.execute(stmt)).all()
+        return [_row_to_entity(row) for row in rows]
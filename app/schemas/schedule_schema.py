@@ -1,6 +1,6 @@
-from pydantic import BaseModel
-from typing import List, Optional
-from datetime import datetime
+from pydantic import BaseModel, Field
+from typing import List, Literal, Optional
+from datetime import date, datetime
 from fastapi import Query
 from uuid import UUID
 
@@ -10,3 +10,15 @@ class ReadVigils(BaseModel):
     end_at: Optional[datetime] = None
     user_ids: Optional[List[UUID]] = Query(None)
     vigil_ids: Optional[List[UUID]] = Query(None)
+    format: Literal["rows", "columnar"] = "rows"
+
+
+class ReadCalendar(BaseModel):
+    year: int = Field(ge=2000, le=2100)
+    month: int = Field(ge=1, le=12)
+
+
+class ReadVigilStats(BaseModel):
+    # свертка хранится по месяцам: учитываются месяцы целиком
+    start_month: date
+    end_month: date
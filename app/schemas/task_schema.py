@@ -1,5 +1,5 @@
-from pydantic import BaseModel, field_validator
-from typing import Optional, List
+from pydantic import BaseModel, Field, field_validator
+from typing import Literal, Optional, List
 from datetime import datetime
 from uuid import UUID
 
@@ -49,3 +49,12 @@ class TaskUpdate(BaseModel):
 
 class TaskDelete(BaseModel):
     id: UUID
+
+
+class ReadTasks(BaseModel):
+    owner_id: Optional[UUID] = None
+    status: Optional[Literal["in_progress", "expired", "deleted"]] = None
+    expired_from: Optional[datetime] = None
+    expired_to: Optional[datetime] = None
+    cursor: Optional[str] = None
+    limit: int = Field(50, ge=1, le=200)
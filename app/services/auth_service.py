@@ -1,34 +1,40 @@
 import asyncio
+import time
 from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from typing import Tuple
 from uuid import UUID
 
 import jwt
-from passlib.context import CryptContext
 
+from app.core.cache import TTLCache
 from app.core.config import settings
+from app.core.password_hashing import password_hasher
 from app.exceptions.exceptions import (
     InvalidCredentialsError,
     InvalidRefreshTokenError,
 )
+from app.interfaces.interfaces import IRefreshTokenStore
 from app.repositories.user_repository import IUserRepository
 
 
 class AuthService:
-    pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
     ALGORITHM = "HS256"
 
     _executor = ThreadPoolExecutor()
-
-    def __init__(self, user_repo: IUserRepository):
+    # уже проверенные токены: claims живут в кэше до истечения exp
+    _verified_tokens = TTLCache(maxsize=settings.JWT_CACHE_MAX_SIZE, ttl=0)
+
+    def __init__(
+        self,
+        user_repo: IUserRepository,
+        token_store: IRefreshTokenStore = None,
+    ):
         self.repo = user_repo
+        self.token_store = token_store
 
     async def verify_password(self, plain: str, hashed: str) -> bool:
-        loop = asyncio.get_running_loop()
-        return await loop.run_in_executor(
-            self._executor, self.pwd_context.verify, plain, hashed
-        )
+        return await password_hasher.verify(plain, hashed)
 
     async def _create_token(
         self, user_id: UUID, expires_delta: timedelta, token_type: str
@@ -58,18 +64,25 @@ class AuthService:
             "refresh",
         )
 
+    async def _decode_token(self, token: str) -> dict:
+        payload = self._verified_tokens.get(token)
+        if payload is not None:
+            return payload
+
+        # HMAC-подпись (HS256) проверяется за десятки микросекунд — дешевле,
+        # чем переход в пул потоков, поэтому прямо в event loop
+        payload = jwt.decode(token, settings.JWT_SECRET, [self.ALGORITHM])
+
+        ttl = payload.get("exp", 0) - time.time()
+        if ttl > 0:
+            self._verified_tokens.set(token, payload, ttl=ttl)
+        return payload
+
     async def verify_token(
         self, token: str, token_type: str = "access"
     ) -> UUID:
-        loop = asyncio.get_running_loop()
         try:
-            payload = await loop.run_in_executor(
-                self._executor,
-                jwt.decode,
-                token,
-                settings.JWT_SECRET,
-                [self.ALGORITHM],
-            )
+            payload = await self._decode_token(token)
             if payload.get("type") != token_type:
                 raise InvalidRefreshTokenError("Invalid token type")
             user = UUID(payload.get("sub"))
@@ -89,21 +102,17 @@ class AuthService:
             self.create_refresh_token(user.id),
         )
 
-        await self.repo.save_refresh_token(user.id, refresh)
+        await self.token_store.save(user.id, refresh)
         return access, refresh
 
     async def refresh_tokens(self, refresh_token: str) -> Tuple[str, str]:
         user_id = await self.verify_token(refresh_token, "refresh")
-        saved_token = await self.repo.get_refresh_token(user_id)
-        if not saved_token:
-            raise InvalidRefreshTokenError("Refresh token not found")
-        if saved_token != refresh_token:
-            raise InvalidRefreshTokenError("Refresh token revoked")
 
         new_access, new_refresh = await asyncio.gather(
             self.create_access_token(user_id),
             self.create_refresh_token(user_id),
         )
 
-        await self.repo.save_refresh_token(user_id, new_refresh)
+        # проверка старого токена и замена на новый — одна атомарная операция
+        await self.token_store.rotate(user_id, refresh_token, new_refresh)
         return new_access, new_refresh
@@ -0,0 +1,294 @@
+import datetime
+import io
+from typing import Any, Dict, Iterator, List, Tuple
+
+from openpyxl import load_workbook
+
+from app.exceptions.exceptions import ExcelParsingError
+
+# строки, которые pandas.read_excel по умолчанию превращает в NaN
+_NA_STRINGS = {
+    "",
+    "#N/A",
+    "#N/A N/A",
+    "#NA",
+    "-1.#IND",
+    "-1.#QNAN",
+    "-NaN",
+    "-nan",
+    "1.#IND",
+    "1.#QNAN",
+    "<NA>",
+    "N/A",
+    "NA",
+    "NULL",
+    "NaN",
+    "None",
+    "n/a",
+    "nan",
+    "null",
+}
+
+
+def _clean(value: Any) -> Any:
+    """Приводит значение ячейки к тому, что вернул бы pandas (пустое -> None)."""
+    if value is None:
+        return None
+    if isinstance(value, str) and value in _NA_STRINGS:
+        return None
+    if isinstance(value, float):
+        if value != value:
+            return None
+        if value.is_integer():
+            return int(value)
+    return value
+
+
+def _cell(row: Tuple, c: int) -> Any:
+    if c < 0 or c >= len(row):
+        return None
+    return _clean(row[c])
+
+
+def _find(row: Tuple, target: Any) -> int | None:
+    for c, value in enumerate(row):
+        if value == target:
+            return c
+    return None
+
+
+def _rows(workbook, sheet_name: str) -> Iterator[Tuple[int, Tuple]]:
+    sheet = workbook[sheet_name]
+    # размеры из файла бывают неверными — читаем с A1, как pandas
+    sheet.reset_dimensions()
+    return enumerate(sheet.iter_rows(values_only=True))
+
+
+def _read_settings(workbook) -> Tuple[datetime.datetime, List[datetime.datetime]]:
+    start_at = None
+    start_col = None
+    gk_seen = 0
+    gk_col = None
+    g_c_dates = None
+
+    for r, row in _rows(workbook, "Настройка графика"):
+        if start_col is not None and start_at is None:
+            start_at = _cell(row, start_col)
+            if start_at is None:
+                raise ExcelParsingError(
+                    "Начальная дата календаря нарядов не найдена или пуста (лист 'Настройка графика')"
+                )
+        if gk_col is not None and g_c_dates is None:
+            g_c_dates = []
+            for offset in range(0, 10):
+                val = _cell(row, gk_col + offset)
+                if not isinstance(val, datetime.datetime):
+                    break
+                g_c_dates.append(val)
+
+        if start_col is None:
+            start_col = _find(row, "Начальная дата календаря нарядов")
+        if gk_col is None:
+            for c, value in enumerate(row):
+                if value == "Расписание ГК":
+                    gk_seen += 1
+                    # первое вхождение — строка со всеми датами, нужна вторая
+                    if gk_seen == 2:
+                        gk_col = c
+                        break
+
+        if start_at is not None and g_c_dates is not None:
+            break
+
+    if start_col is None:
+        raise ExcelParsingError(
+            "Не найдена ячейка 'Начальная дата календаря нарядов' на листе 'Настройка графика'"
+        )
+    if start_at is None:
+        raise ExcelParsingError(
+            "Начальная дата календаря нарядов не найдена или пуста (лист 'Настройка графика')"
+        )
+    if gk_col is None:
+        raise ExcelParsingError(
+            "Не найдено второе вхождение 'Расписание ГК' (лист 'Настройка графика')"
+        )
+    return start_at, g_c_dates or []
+
+
+GRID_ROW_START = 2
+
+
+class _VigilsSheet:
+    """Нужные парсеру области листа нарядов, остальные строки не сохраняются."""
+
+    def __init__(self):
+        self.fios_post: Dict[Any, Any] = {}
+        self.grid: Dict[int, Tuple] = {}
+        self.responsible_row: Tuple | None = None
+        self.responsible_col: int | None = None
+        self.start_row: Tuple | None = None
+        self.start_col: int | None = None
+
+    @property
+    def grid_end(self) -> int:
+        return GRID_ROW_START + len(self.fios_post) + 1
+
+
+def _read_vigils_sheet(
+    workbook,
+    sheet_name: str,
+    fio_pos: Tuple[int, int] | None,
+    start_at: datetime.datetime | None = None,
+    need_responsible: bool = False,
+) -> Tuple[_VigilsSheet, Tuple[int, int] | None]:
+    sheet = _VigilsSheet()
+    fios_done = False
+
+    for r, row in _rows(workbook, sheet_name):
+        if fio_pos is None:
+            c = _find(row, "ФИО")
+            if c is not None:
+                fio_pos = (r, c)
+        if start_at is not None and sheet.start_row is None:
+            c = _find(row, start_at)
+            if c is not None:
+                sheet.start_row, sheet.start_col = row, c
+        if need_responsible and sheet.responsible_row is None:
+            c = _find(row, "График ответственных")
+            if c is not None:
+                sheet.responsible_row, sheet.responsible_col = row, c
+
+        # ФИО и должности — вниз от ячейки "ФИО" (начиная с +3) до первой пустой
+        if fio_pos is not None and not fios_done and r >= fio_pos[0] + 3:
+            name = _cell(row, fio_pos[1])
+            if name is None:
+                fios_done = True
+            else:
+                sheet.fios_post[name] = _cell(row, fio_pos[1] + 1)
+
+        # пока список ФИО не дочитан, границу таблицы не знаем — буферизуем
+        if r >= GRID_ROW_START and (not fios_done or r < sheet.grid_end):
+            sheet.grid[r] = row
+
+        if (
+            fios_done
+            and r >= sheet.grid_end
+            and (start_at is None or sheet.start_row is not None)
+            and (not need_responsible or sheet.responsible_row is not None)
+        ):
+            break
+
+    sheet.grid = {r: row for r, row in sheet.grid.items() if r < sheet.grid_end}
+    return sheet, fio_pos
+
+
+def _grid_schedule(
+    sheet: _VigilsSheet, fio_col: int, col_start: int, col_end: int
+) -> Tuple[List[Any], Dict[str, dict]]:
+    header_row = sheet.grid.get(GRID_ROW_START, ())
+    dates = [_cell(header_row, c) for c in range(col_start, col_end)]
+
+    schedule_dict = {}
+    for r in range(GRID_ROW_START + 1, sheet.grid_end):
+        row = sheet.grid.get(r, ())
+        fio = _cell(row, fio_col)
+        position = sheet.fios_post.get(fio)
+        schedule = {
+            str(date)[:10]: _cell(row, c)
+            for date, c in zip(dates, range(col_start, col_end))
+        }
+        # pandas превращает пустое ФИО в NaN, сохраняем тот же ключ
+        schedule_dict["nan" if fio is None else str(fio).strip()] = {
+            "position": str(position) if position is not None else None,
+            "schedule": schedule,
+        }
+    return dates, schedule_dict
+
+
+def parse_excel_sheets_streaming(
+    file_bytes: bytes,
+) -> Dict[str, Dict[Any, Any]]:
+    """
+    То же, что parse_excel_sheets, но без pandas: листы читаются openpyxl в режиме
+    read_only построчно, в памяти держатся только области вокруг якорных ячеек.
+    """
+    workbook = load_workbook(
+        io.BytesIO(file_bytes), read_only=True, data_only=True
+    )
+    try:
+        scheduler_start_at, g_c_dates = _read_settings(workbook)
+
+        summer, fio_pos = _read_vigils_sheet(
+            workbook,
+            "Календарь нарядов (ЛЕТ)",
+            fio_pos=None,
+            start_at=scheduler_start_at,
+            need_responsible=True,
+        )
+        if summer.responsible_row is None:
+            raise ExcelParsingError(
+                "Не найдена ячейка 'График ответственных' (лист 'Календарь нарядов (ЛЕТ)')"
+            )
+        if fio_pos is None:
+            raise ExcelParsingError(
+                "Не найдена ячейка 'ФИО' (лист 'Календарь нарядов (ЛЕТ)')"
+            )
+        if summer.start_row is None:
+            raise ExcelParsingError(
+                "Не найдена ячейка с датой старта в 'Календарь нарядов (ЛЕТ)'"
+            )
+
+        # ---- График ответственных ----
+        scheduler_responsible = {}
+        scheduler_current_date = scheduler_start_at
+        row = summer.responsible_row
+        for c in range(summer.responsible_col + 1, len(row)):
+            val = _cell(row, c)
+            if val is None:
+                break
+            scheduler_responsible[
+                scheduler_current_date.strftime("%d-%m-%Y")
+            ] = val
+            scheduler_current_date += datetime.timedelta(days=1)
+
+        # ---- кол-во дат вправо от стартовой ----
+        date_count = 1
+        for c in range(summer.start_col + 1, len(summer.start_row)):
+            if _cell(summer.start_row, c) is None:
+                break
+            date_count += 1
+            if date_count > 200:
+                raise ExcelParsingError(
+                    "Ошибка в чтении дат нарядов: найдено подозрительно много дат (>200)."
+                )
+
+        col_start = summer.start_col
+        col_end = col_start + date_count
+
+        winter, _ = _read_vigils_sheet(
+            workbook, "Календарь нарядов (ЗИМ)", fio_pos=fio_pos
+        )
+
+        summer_dates, summer_schedule = _grid_schedule(
+            summer, fio_pos[1], col_start, col_end
+        )
+        winter_dates, winter_schedule = _grid_schedule(
+            winter, fio_pos[1], col_start, col_end
+        )
+        if summer_dates != winter_dates:
+            raise ExcelParsingError(
+                "Наборы дат в летнем и зимнем расписаниях не совпадают!"
+            )
+
+        return {
+            "schedule_vigils": {**summer_schedule, **winter_schedule},
+            "schedule_responsible": scheduler_responsible,
+            "gc_schedule": g_c_dates,
+        }
+
+    except Exception as e:
+        raise ExcelParsingError(
+            f"Таблица графиков была изменена, ошибка чтения данных: {e}"
+        )
+    finally:
+        workbook.close()
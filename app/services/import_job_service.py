@@ -0,0 +1,155 @@
+import asyncio
+import hashlib
+import uuid
+from datetime import datetime, timezone
+from uuid import UUID
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.entities.import_job import ImportJobEntity
+from app.exceptions.exceptions import (
+    ExcelParsingError,
+    ImportJobSuperseded,
+    NoVigilsDataFromExcel,
+    VigilsTypeNotFound,
+)
+from app.interfaces.interfaces import IImportJobStore
+from app.logger.logger import logger
+from app.repositories.import_job_repository import redis_import_job_store
+from app.repositories.schedule_repository import ScheduleRepository
+from app.repositories.user_repository import UserRepository
+from app.services.schedule_service import ScheduleService
+from app.services.user_name_index import user_name_index
+
+ACTIVE_STATUSES = ("queued", "running")
+
+# этапы импорта и прогресс (%) на их начало
+STAGES = {
+    "queued": 0,
+    "parsing": 10,
+    "matching_users": 40,
+    "saving": 60,
+    "done": 100,
+}
+
+
+class ImportJobRunner:
+    """
+    Фоновый импорт графика нарядов: загрузка сразу возвращает задачу,
+    разбор, сопоставление пользователей и запись идут в asyncio-задаче
+    со своей сессией БД. Состояние задачи хранится в IImportJobStore и
+    доступно на чтение с любого воркера.
+    """
+
+    def __init__(self, store: IImportJobStore, concurrency: int):
+        self.store = store
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._tasks: dict[asyncio.Task, ImportJobEntity] = {}
+
+    async def submit(self, file_bytes: bytes, user_id: UUID) -> ImportJobEntity:
+        """Создает задачу или возвращает уже идущую для того же файла."""
+        file_hash = hashlib.sha256(file_bytes).hexdigest()
+        job = ImportJobEntity(
+            id=uuid.uuid4(),
+            status="queued",
+            stage="queued",
+            progress=STAGES["queued"],
+            file_hash=file_hash,
+            created_by=user_id,
+            created_at=datetime.now(timezone.utc),
+        )
+
+        # задача записывается до закрепления файла: тогда закрепление
+        # без записи задачи может остаться только от истекшей задачи
+        await self.store.save(job)
+        while (
+            owner_id := await self.store.claim_file(file_hash, job.id)
+        ) != job.id:
+            owner = await self.store.get(owner_id)
+            if owner is not None and owner.status in ACTIVE_STATUSES:
+                await self.store.delete(job.id)
+                return owner
+            # закрепление осталось от завершенной задачи — снимаем и пробуем снова
+            await self.store.release_file(file_hash, owner_id)
+
+        task = asyncio.create_task(self._run(job, file_bytes))
+        self._tasks[task] = job
+        task.add_done_callback(lambda t: self._tasks.pop(t, None))
+        return job
+
+    async def get(self, job_id: UUID) -> ImportJobEntity | None:
+        return await self.store.get(job_id)
+
+    async def _stage(self, job: ImportJobEntity, stage: str):
+        # пока задача ждала очереди, закрепление могло истечь и достаться
+        # повторной загрузке того же файла — тогда импортирует она
+        if not await self.store.refresh_file(job.file_hash, job.id):
+            raise ImportJobSuperseded(
+                "Этот файл уже импортируется другой задачей"
+            )
+        job.status = "running"
+        job.stage = stage
+        job.progress = STAGES[stage]
+        await self.store.save(job)
+
+    async def _finish(
+        self,
+        job: ImportJobEntity,
+        result: dict | None = None,
+        error: str | None = None,
+    ):
+        if error:
+            job.status = "failed"
+        else:
+            job.status = "done"
+            job.stage = "done"
+            job.progress = STAGES["done"]
+        job.result = result
+        job.error = error
+        job.finished_at = datetime.now(timezone.utc)
+        await self.store.save(job)
+        await self.store.release_file(job.file_hash, job.id)
+
+    async def _run(self, job: ImportJobEntity, file_bytes: bytes):
+        try:
+            async with self._semaphore:
+                async with SessionLocal() as session:
+                    schedule_service = ScheduleService(ScheduleRepository(session))
+
+                    await self._stage(job, "parsing")
+                    info = await schedule_service.process_vigils_schedule(
+                        file_bytes
+                    )
+                    await self._stage(job, "matching_users")
+                    names = await user_name_index.get(UserRepository(session))
+                    await self._stage(job, "saving")
+                    result = await schedule_service.create_vigils(info, names)
+
+            await self._finish(job, result=result)
+
+        except (
+            ExcelParsingError,
+            ImportJobSuperseded,
+            NoVigilsDataFromExcel,
+            VigilsTypeNotFound,
+        ) as e:
+            await self._finish(job, error=str(e))
+        except Exception as e:
+            logger.exception(f"Импорт графика {job.id} завершился ошибкой: {e}")
+            await self._finish(job, error="Внутренняя ошибка при импорте графика")
+
+    async def shutdown(self):
+        jobs = list(self._tasks.values())
+        for task in list(self._tasks):
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+        for job in jobs:
+            if job.status in ACTIVE_STATUSES:
+                await self._finish(job, error="Импорт прерван остановкой сервера")
+
+
+import_job_runner = ImportJobRunner(
+    store=redis_import_job_store,
+    concurrency=settings.IMPORT_JOB_CONCURRENCY,
+)
@@ -1,4 +1,9 @@
-from app.repositories.minio_repository import MinioRepository
+from app.repositories.minio_repository import (
+    AsyncReadable,
+    MinioRepository,
+    StoredObject,
+)
+from app.services.storage_listing_cache import storage_listing_cache
 
 
 class MinioService:
@@ -21,6 +26,29 @@ class MinioService:
         await self.repo.upload_file(
             key=filename, data=file, bucket_name=bucket_name
         )
+        await storage_listing_cache.invalidate(
+            bucket_name or self.repo.bucket_name
+        )
+
+    async def upload_stream(
+        self,
+        filename: str,
+        file: AsyncReadable,
+        bucket_name: str = None,
+        directory: str = None,
+    ):
+        if directory:
+            if not directory.strip()[-1] == "/":
+                directory += "/"
+
+            filename = f"{directory}{filename}"
+
+        await self.repo.upload_stream(
+            key=filename, stream=file, bucket_name=bucket_name
+        )
+        await storage_listing_cache.invalidate(
+            bucket_name or self.repo.bucket_name
+        )
 
     async def get_all_files(
         self, directory: str = None, bucket_name: str = None
@@ -29,6 +57,49 @@ class MinioService:
             directory=directory, bucket_name=bucket_name
         )
 
+    async def list_directory(
+        self,
+        directory: str = None,
+        bucket_name: str = None,
+        recursive: bool = False,
+        limit: int = None,
+        cursor: str = None,
+    ) -> dict:
+        """
+        Листинг папки с размером и временем изменения файлов. С limit
+        отдается одна страница и next_cursor для следующей, без него — вся
+        папка целиком.
+        """
+        bucket = bucket_name or self.repo.bucket_name
+        params = (directory or "", recursive, limit, cursor)
+        version = await storage_listing_cache.version(bucket)
+        cached = await storage_listing_cache.get(bucket, version, params)
+        if cached is not None:
+            return cached
+
+        if limit:
+            items, next_cursor = await self.repo.list_page(
+                limit,
+                cursor=cursor,
+                bucket_name=bucket,
+                directory=directory,
+                recursive=recursive,
+            )
+        else:
+            items = [
+                entry
+                async for entry in self.repo.iter_entries(
+                    bucket_name=bucket,
+                    directory=directory,
+                    recursive=recursive,
+                )
+            ]
+            next_cursor = None
+
+        listing = {"items": items, "next_cursor": next_cursor}
+        await storage_listing_cache.set(bucket, version, params, listing)
+        return listing
+
     async def get_file_content(
         self, filename: str, bucket_name: str = None, directory: str = None
     ) -> bytes:
@@ -39,6 +110,25 @@ class MinioService:
         data = await self.repo.download_file(filename, bucket_name=bucket_name)
         return data
 
+    async def open_file(
+        self,
+        filename: str,
+        bucket_name: str = None,
+        directory: str = None,
+        byte_range: str = None,
+        if_none_match: str = None,
+    ) -> StoredObject:
+        if directory:
+            if not directory.strip()[-1] == "/":
+                directory += "/"
+            filename = f"{directory}{filename}"
+        return await self.repo.open_file(
+            filename,
+            bucket_name=bucket_name,
+            byte_range=byte_range,
+            if_none_match=if_none_match,
+        )
+
     async def remove_file(
         self, filename: str, bucket_name: str = None, directory: str = None
     ):
@@ -48,3 +138,43 @@ class MinioService:
             filename = f"{directory}{filename}"
 
         await self.repo.delete_file(key=filename, bucket_name=bucket_name)
+        await storage_listing_cache.invalidate(
+            bucket_name or self.repo.bucket_name
+        )
+
+    async def move_file(
+        self,
+        filename: str,
+        bucket_name: str = None,
+        directory_from: str = None,
+        directory_to: str = None,
+    ):
+        src_key = dest_key = filename
+        if directory_from:
+            src_key = f"{directory_from.strip().rstrip('/')}/{filename}"
+        if directory_to:
+            dest_key = f"{directory_to.strip().rstrip('/')}/{filename}"
+
+        await self.repo.move_file(
+            src_key=src_key, dest_key=dest_key, bucket_name=bucket_name
+        )
+        await storage_listing_cache.invalidate(
+            bucket_name or self.repo.bucket_name
+        )
+
+    async def move_directory(
+        self, directory_from: str, directory_to: str, bucket_name: str = None
+    ) -> dict:
+        src_prefix = f"{directory_from.strip().rstrip('/')}/"
+        dest_prefix = f"{directory_to.strip().rstrip('/')}/"
+        try:
+            return await self.repo.move_prefix(
+                src_prefix=src_prefix,
+                dest_prefix=dest_prefix,
+                bucket_name=bucket_name,
+            )
+        finally:
+            # часть объектов могла переехать и при ошибке
+            await storage_listing_cache.invalidate(
+            bucket_name or self.repo.bucket_name
+        )
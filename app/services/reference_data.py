@@ -0,0 +1,130 @@
+import asyncio
+import time
+from collections import defaultdict
+from typing import Dict, List
+from uuid import UUID
+
+from app.core.cache_version import bump_cache_version, get_cache_version
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.entities.company_duty import CompanyDutyEntity
+from app.entities.post import PostEntity
+from app.entities.rank import RankEntity
+from app.entities.vigil_enum import VigilEnumEntity
+from app.repositories.reference_data_repository import ReferenceDataRepository
+
+
+class ReferenceData:
+    """
+    Снимок справочников: типы нарядов, звания, должности и обязанности.
+    Не изменяется после создания, поэтому его можно безопасно отдавать
+    нескольким запросам одновременно.
+    """
+
+    def __init__(
+        self,
+        vigil_types: List[VigilEnumEntity],
+        ranks: List[RankEntity],
+        posts: List[PostEntity],
+        duties: List[CompanyDutyEntity],
+    ):
+        self.vigil_types = vigil_types
+        self.ranks = ranks
+        self.posts = posts
+        self.duties = duties
+
+        self._vigils_by_id = {v.id: v for v in vigil_types}
+        self._vigils_by_name = {v.name: v for v in vigil_types}
+        self._vigils_by_csv: Dict[str, List[VigilEnumEntity]] = defaultdict(list)
+        for v in vigil_types:
+            self._vigils_by_csv[v.name_in_csv].append(v)
+
+        self._ranks_by_id = {r.id: r for r in ranks}
+        self._ranks_by_name = {r.name: r for r in ranks}
+        self._posts_by_id = {p.id: p for p in posts}
+        self._posts_by_name = {p.name: p for p in posts}
+        self._duties_by_id = {d.id: d for d in duties}
+        self._duties_by_name = {d.name: d for d in duties}
+
+    def vigil_type(self, vigil_id: UUID) -> VigilEnumEntity | None:
+        return self._vigils_by_id.get(vigil_id)
+
+    def vigil_type_by_name(self, name: str) -> VigilEnumEntity | None:
+        return self._vigils_by_name.get(name)
+
+    def vigil_types_by_csv(self, code: str) -> List[VigilEnumEntity]:
+        return list(self._vigils_by_csv.get(code, []))
+
+    def rank(self, rank_id: UUID) -> RankEntity | None:
+        return self._ranks_by_id.get(rank_id)
+
+    def rank_by_name(self, name: str) -> RankEntity | None:
+        return self._ranks_by_name.get(name)
+
+    def post(self, post_id: UUID) -> PostEntity | None:
+        return self._posts_by_id.get(post_id)
+
+    def post_by_name(self, name: str) -> PostEntity | None:
+        return self._posts_by_name.get(name)
+
+    def duty(self, duty_id: UUID) -> CompanyDutyEntity | None:
+        return self._duties_by_id.get(duty_id)
+
+    def duty_by_name(self, name: str) -> CompanyDutyEntity | None:
+        return self._duties_by_name.get(name)
+
+
+class ReferenceDataCache:
+    """
+    Справочники в памяти процесса, загружаются в lifespan.
+    Изменение справочников в любом воркере увеличивает версию в Redis;
+    версия сверяется не чаще раза в check_interval секунд, после чего
+    устаревший снимок перечитывается из БД.
+    """
+
+    VERSION_NAME = "reference_data"
+
+    def __init__(self, check_interval: float):
+        self.check_interval = check_interval
+        self._data: ReferenceData | None = None
+        self._version: int | None = None
+        self._checked_at = 0.0
+        self._lock = asyncio.Lock()
+
+    async def get(self) -> ReferenceData:
+        if (
+            self._data is not None
+            and time.monotonic() - self._checked_at < self.check_interval
+        ):
+            return self._data
+
+        version = await get_cache_version(self.VERSION_NAME)
+        if self._data is not None and version is not None and version == self._version:
+            self._checked_at = time.monotonic()
+            return self._data
+
+        async with self._lock:
+            if self._data is None or version is None or version != self._version:
+                await self._load(version)
+            return self._data
+
+    async def load(self):
+        """Первичная загрузка при старте приложения."""
+        async with self._lock:
+            await self._load(await get_cache_version(self.VERSION_NAME))
+
+    async def _load(self, version: int | None):
+        async with SessionLocal() as session:
+            data = await ReferenceDataRepository(session).get_all()
+        self._data = ReferenceData(*data)
+        self._version = version
+        self._checked_at = time.monotonic()
+
+    async def invalidate(self):
+        self._data = None
+        await bump_cache_version(self.VERSION_NAME)
+
+
+reference_data = ReferenceDataCache(
+    check_interval=settings.REFERENCE_DATA_CHECK_SECONDS
+)
@@ -0,0 +1,57 @@
+import json
+
+from redis.exceptions import RedisError
+
+from app.core.cache_version import bump_cache_version, get_cache_version
+from app.core.config import settings
+from app.core.redis import redis_client
+from app.logger.logger import logger
+
+
+class ScheduleCalendarCache:
+    """
+    Готовые календари нарядов по месяцам в Redis.
+    Версия графика входит в ключ: импорт увеличивает ее, и все месяцы
+    сразу становятся недействительными, а старые ключи истекают по ttl.
+    """
+
+    KEY_PREFIX = "schedule_calendar:"
+    VERSION_NAME = "schedule"
+
+    def __init__(self, ttl: int):
+        self.ttl = ttl
+
+    def _key(self, version: int, month: str) -> str:
+        return f"{self.KEY_PREFIX}{version}:{month}"
+
+    async def version(self) -> int | None:
+        return await get_cache_version(self.VERSION_NAME)
+
+    async def get(self, version: int | None, month: str) -> dict | None:
+        if version is None:
+            return None
+        try:
+            raw = await redis_client.get(self._key(version, month))
+        except RedisError as e:
+            logger.warning(f"Кэш календаря: Redis недоступен: {e}")
+            return None
+        return json.loads(raw) if raw else None
+
+    async def set(self, version: int | None, month: str, calendar: dict):
+        """version — та, что была прочитана до построения календаря."""
+        if version is None:
+            return
+        try:
+            await redis_client.set(
+                self._key(version, month), json.dumps(calendar), ex=self.ttl
+            )
+        except RedisError as e:
+            logger.warning(f"Кэш календаря: Redis недоступен: {e}")
+
+    async def invalidate(self):
+        await bump_cache_version(self.VERSION_NAME)
+
+
+schedule_calendar_cache = ScheduleCalendarCache(
+    ttl=settings.SCHEDULE_CALENDAR_CACHE_TTL_SECONDS
+)
@@ -1,13 +1,20 @@
 import datetime
+import functools
+import hashlib
+import inspect
 import io
 import asyncio
 import pandas as pd
-from concurrent.futures import ProcessPoolExecutor
+from collections import defaultdict
+from concurrent.futures.process import BrokenProcessPool
 from typing import Dict, List
+from uuid import UUID
 from dateutil.relativedelta import relativedelta
 
+from app.core.config import settings
+from app.core.parsing_pool import parsing_pool
+from app.core.workbook_cache import parsed_workbook_cache
 from app.entities.schedule_vigil import ScheduleVigilEntity
-from app.entities.user import UserEntity
 from app.interfaces.interfaces import IScheduleRepository
 from app.exceptions.exceptions import (
     ExcelParsingError,
@@ -15,6 +22,12 @@ from app.exceptions.exceptions import (
     NoVigilsDataFromExcel,
 )
 from app.models import ScheduleVigil
+from app.services.excel_streaming_parser import parse_excel_sheets_streaming
+from app.services.reference_data import reference_data
+from app.services.schedule_calendar import schedule_calendar_cache
+from app.services.user_name_index import UserNameIndex
+from app.services.vigil_decoder import VigilDecoder
+from app.services.vigils_columnar import ColumnarVigils
 
 
 def parse_excel_sheets(file_bytes: bytes) -> Dict[str, Dict[any, any]]:
@@ -255,40 +268,186 @@ def parse_excel_sheets(file_bytes: bytes) -> Dict[str, Dict[any, any]]:
         )
 
 
+@functools.lru_cache
+def _parser_version(parser) -> str:
+    """Версия для ключа кэша: меняется при любом изменении модуля парсера."""
+    source = inspect.getsource(inspect.getmodule(parser))
+    return f"{parser.__name__}:{hashlib.sha256(source.encode()).hexdigest()[:16]}"
+
+
 class ScheduleService:
     def __init__(self, schedule_repo: IScheduleRepository):
         self.schedule_repo = schedule_repo
 
     async def get_vigils(self, **kwargs) -> List[ScheduleVigilEntity]:
-        resp_vigil_id = await self.schedule_repo.get_vigils_type(
-            name=["Ответственный"]
-        )
-        if resp_vigil_id:
-            kwargs["ignore_id"] = resp_vigil_id[0].id
+        refs = await reference_data.get()
+        resp_vigil = refs.vigil_type_by_name("Ответственный")
+        if resp_vigil:
+            kwargs["ignore_id"] = resp_vigil.id
         return await self.schedule_repo.get_vigils(**kwargs)
 
+    async def get_vigils_columnar(self, **kwargs) -> ColumnarVigils:
+        refs = await reference_data.get()
+        resp_vigil = refs.vigil_type_by_name("Ответственный")
+        if resp_vigil:
+            kwargs["ignore_id"] = resp_vigil.id
+
+        columnar = ColumnarVigils()
+        async for rows in self.schedule_repo.stream_vigils(**kwargs):
+            columnar.add(rows)
+        return columnar
+
+    async def get_calendar(self, year: int, month: int) -> dict:
+        """
+        Календарь нарядов за месяц: по дням — кто в каком наряде, ответственный
+        и день ГК; за месяц — число нарядов по типам и по каждому пользователю.
+        """
+        month_key = f"{year:04d}-{month:02d}"
+        version = await schedule_calendar_cache.version()
+        cached = await schedule_calendar_cache.get(version, month_key)
+        if cached is not None:
+            return cached
+
+        start_at = datetime.datetime(year, month, 1)
+        end_at = start_at + relativedelta(months=1)
+        vigils, group_control = await self.schedule_repo.get_calendar(
+            start_at, end_at
+        )
+
+        refs = await reference_data.get()
+        resp_vigil = refs.vigil_type_by_name("Ответственный")
+        resp_vigil_id = resp_vigil.id if resp_vigil else None
+
+        days = {}
+        day = start_at
+        while day < end_at:
+            days[day.date().isoformat()] = {
+                "vigils": {},
+                "responsible": None,
+                "group_control": False,
+            }
+            day += datetime.timedelta(days=1)
+
+        counts = defaultdict(int)
+        users = defaultdict(lambda: defaultdict(int))
+        for date, vigil_id, user_ids in vigils:
+            entry = days[date.date().isoformat()]
+            if vigil_id == resp_vigil_id:
+                entry["responsible"] = str(user_ids[0])
+                continue
+            vigil_key = str(vigil_id)
+            entry["vigils"][vigil_key] = [str(u) for u in user_ids]
+            counts[vigil_key] += len(user_ids)
+            for user_id in user_ids:
+                users[str(user_id)][vigil_key] += 1
+
+        gc_dates = [d.date().isoformat() for d in group_control]
+        for gc_date in gc_dates:
+            days[gc_date]["group_control"] = True
+
+        calendar = {
+            "month": month_key,
+            "days": days,
+            "counts": dict(counts),
+            "users": {u: dict(c) for u, c in users.items()},
+            "group_control": gc_dates,
+        }
+        await schedule_calendar_cache.set(version, month_key, calendar)
+        return calendar
+
+    async def get_vigil_stats(
+        self,
+        start_month: datetime.date,
+        end_month: datetime.date,
+        user_ids: List[UUID] = None,
+        vigil_ids: List[UUID] = None,
+    ) -> dict:
+        """
+        Нагрузка нарядами за месяцы [start_month, end_month]: по пользователю —
+        всего, по типам, по дням недели (0 — понедельник), в выходные и самая
+        длинная серия дней подряд; по типам — сколько нарядов всего.
+        """
+        start_month = start_month.replace(day=1)
+        end_month = end_month.replace(day=1)
+        if end_month < start_month:
+            raise ValueError("end_month must not be earlier than start_month")
+
+        rows = await self.schedule_repo.get_stats(
+            start_month, end_month, user_ids=user_ids, vigil_ids=vigil_ids
+        )
+        start_at = datetime.datetime.combine(start_month, datetime.time())
+        end_at = datetime.datetime.combine(
+            end_month, datetime.time()
+        ) + relativedelta(months=1)
+        streaks = await self.schedule_repo.get_longest_streaks(
+            start_at, end_at, user_ids=user_ids, vigil_ids=vigil_ids
+        )
+
+        def user_entry(user_id) -> dict:
+            return users.setdefault(
+                str(user_id),
+                {
+                    "total": 0,
+                    "by_type": {},
+                    "by_weekday": [0] * 7,
+                    "weekend": 0,
+                    "longest_streak": 0,
+                },
+            )
+
+        users = {}
+        types = defaultdict(int)
+        for user_id, vigil_id, weekday, count in rows:
+            entry = user_entry(user_id)
+            vigil_key = str(vigil_id)
+            entry["total"] += count
+            entry["by_type"][vigil_key] = entry["by_type"].get(vigil_key, 0) + count
+            entry["by_weekday"][weekday] += count
+            if weekday >= 5:
+                entry["weekend"] += count
+            types[vigil_key] += count
+
+        for user_id, streak in streaks.items():
+            user_entry(user_id)["longest_streak"] = streak
+
+        return {
+            "start_month": start_month.isoformat(),
+            "end_month": end_month.isoformat(),
+            "types": dict(types),
+            "users": users,
+        }
+
     async def create_vigils(
-        self, info: Dict[str, Dict[str, str]], users: list[UserEntity]
+        self, info: Dict[str, Dict[str, str]], names: UserNameIndex
     ):
         """ "Обработка данных из Excel и создание записей в таблицах График группы контроля, График нарядов"""
-        try:
-            vigils_type = await self.schedule_repo.get_vigils_type()
-        except VigilsTypeNotFound:
-            raise
-        except Exception as e:
-            raise e
+        refs = await reference_data.get()
+        vigils_type = refs.vigil_types
+        if not vigils_type:
+            raise VigilsTypeNotFound(
+                "Vigils type not added in db, maybe you not run utils route to create base working data"
+            )
+
+        vigil_resp = refs.vigil_type_by_name("Ответственный")
+        vigil_resp_id = vigil_resp.id if vigil_resp else None
+        if not vigil_resp_id:
+            raise VigilsTypeNotFound(
+                "В БД отсутствуют тип дежурства 'Ответственный'"
+            )
 
         vigils = info.get("schedule_vigils")
         responsible = info.get("schedule_responsible")
+        # имена из графика, которые подходят сразу нескольким пользователям
+        ambiguous = set()
         group_control = info.get("gc_schedule")
         if vigils:
-            user_map = {u.short_name_2: u.id for u in users}
-
-            vigils_by_id = {
-                user_map[fio]: data
-                for fio, data in vigils.items()
-                if fio in user_map
-            }
+            vigils_by_id = {}
+            for fio, data in vigils.items():
+                user_id = names.by_short_name(fio)
+                if user_id:
+                    vigils_by_id[user_id] = data
+                elif names.is_ambiguous(fio):
+                    ambiguous.add(fio)
 
             if not vigils_by_id:
                 raise NoVigilsDataFromExcel(
@@ -313,12 +472,13 @@ class ScheduleService:
             )
 
         if responsible:
-            user_map = {u.surname: u.id for u in users}
-            filtered_responsible = {
-                date: user_map[fio]
-                for date, fio in responsible.items()
-                if fio in user_map
-            }
+            filtered_responsible = {}
+            for date, fio in responsible.items():
+                user_id = names.by_surname(fio)
+                if user_id:
+                    filtered_responsible[date] = user_id
+                elif names.is_ambiguous(fio):
+                    ambiguous.add(fio)
             if not filtered_responsible:
                 raise NoVigilsDataFromExcel(
                     "Нет данных об ответственных в таблице (либо данные ошибочные), проверьте, что всем именам соответствуют реальные пользователи в системе"
@@ -339,43 +499,58 @@ class ScheduleService:
         gc_min_date = group_control[0].replace(day=1)
         gc_max_date = gc_min_date + relativedelta(months=1)
 
-        await self.schedule_repo.save_group_control_schedule(
-            group_control_schedule=group_control,
-            start_date=gc_min_date,
-            end_date=gc_max_date,
+        # все данные готовятся до начала записи, чтобы транзакция была короткой
+        decoded_vigils = VigilDecoder(vigils_type).decode_schedule(
+            vigils_by_id
         )
-        await self.schedule_repo.save_responsible_schedule(
+        changes = await self.schedule_repo.publish_schedule(
+            group_control=group_control,
+            group_control_period=(gc_min_date, gc_max_date),
             responsible=filtered_responsible,
-            start_date=resp_min_date,
-            end_date=resp_max_date,
-        )
-        await self.schedule_repo.save_vigils_schedule(
-            vigils_schedule=vigils_by_id,
-            start_date=vigils_min_date,
-            end_date=vigils_max_date,
+            responsible_period=(resp_min_date, resp_max_date),
+            vigils=decoded_vigils,
+            vigils_period=(vigils_min_date, vigils_max_date),
+            responsible_vigil_id=vigil_resp_id,
         )
+        await schedule_calendar_cache.invalidate()
+        changes["ambiguous_names"] = sorted(str(name) for name in ambiguous)
+        return changes
 
     async def process_vigils_schedule(
         self, file_bytes: bytes
     ) -> Dict[str, Dict[any, any]]:
         """
         Асинхронно обрабатываем Excel, возвращаем словарь с датафреймами.
+        Повторная загрузка того же файла берется из кэша без обращения к пулу.
         """
-        loop = asyncio.get_event_loop()
+        parser = (
+            parse_excel_sheets_streaming
+            if settings.EXCEL_PARSER == "openpyxl"
+            else parse_excel_sheets
+        )
+        version = _parser_version(parser)
+        digest = hashlib.sha256(file_bytes).hexdigest()
+
+        cached = await parsed_workbook_cache.get(version, digest)
+        if cached is not None:
+            return cached
 
         try:
-            with ProcessPoolExecutor(max_workers=2) as executor:
-                result = await asyncio.wait_for(
-                    loop.run_in_executor(
-                        executor, parse_excel_sheets, file_bytes
-                    ),
-                    timeout=10,
-                )
-                return result
+            result = await parsing_pool.run(
+                parser,
+                file_bytes,
+                timeout=settings.PARSING_TIMEOUT_SECONDS,
+            )
+            await parsed_workbook_cache.set(version, digest, result)
+            return result
         except asyncio.TimeoutError:
             raise ExcelParsingError(
                 "Парсинг Excel завис, возможно файл нестандартный, проверьте файл и попробуйте позже"
             )
+        except BrokenProcessPool:
+            raise ExcelParsingError(
+                "Парсинг Excel был прерван, попробуйте загрузить файл еще раз"
+            )
         except ExcelParsingError as e:
             raise e
         except Exception as e:
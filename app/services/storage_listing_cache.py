@@ -0,0 +1,73 @@
+import json
+
+from redis.exceptions import RedisError
+
+from app.core.cache_version import bump_cache_version, get_cache_version
+from app.core.config import settings
+from app.core.redis import redis_client
+from app.logger.logger import logger
+
+
+class StorageListingCache:
+    """
+    Короткоживущий кэш листингов папок хранилища в Redis.
+    Версия бакета входит в ключ: загрузка, удаление или перенос через
+    MinioService увеличивает ее, и все листинги бакета сразу устаревают.
+    Изменения в обход сервиса видны не позже чем через ttl.
+    """
+
+    KEY_PREFIX = "storage_listing:"
+    # большие полные листинги не кэшируются, чтобы не забивать Redis
+    MAX_ITEMS = 10_000
+
+    def __init__(self, ttl: int, enabled: bool = True):
+        self.ttl = ttl
+        self.enabled = enabled
+
+    def _version_name(self, bucket: str) -> str:
+        return f"{self.KEY_PREFIX}{bucket}"
+
+    def _key(self, bucket: str, version: int, params: tuple) -> str:
+        return f"{self.KEY_PREFIX}{bucket}:{version}:{json.dumps(params)}"
+
+    async def version(self, bucket: str) -> int | None:
+        if not self.enabled:
+            return None
+        return await get_cache_version(self._version_name(bucket))
+
+    async def get(
+        self, bucket: str, version: int | None, params: tuple
+    ) -> dict | None:
+        if version is None:
+            return None
+        try:
+            raw = await redis_client.get(self._key(bucket, version, params))
+        except RedisError as e:
+            logger.warning(f"Кэш листинга хранилища: Redis недоступен: {e}")
+            return None
+        return json.loads(raw) if raw else None
+
+    async def set(
+        self, bucket: str, version: int | None, params: tuple, listing: dict
+    ):
+        """version — та, что была прочитана до запроса листинга в S3."""
+        if version is None or len(listing["items"]) > self.MAX_ITEMS:
+            return
+        try:
+            await redis_client.set(
+                self._key(bucket, version, params),
+                json.dumps(listing),
+                ex=self.ttl,
+            )
+        except RedisError as e:
+            logger.warning(f"Кэш листинга хранилища: Redis недоступен: {e}")
+
+    async def invalidate(self, bucket: str):
+        if self.enabled:
+            await bump_cache_version(self._version_name(bucket))
+
+
+storage_listing_cache = StorageListingCache(
+    ttl=settings.S3_LISTING_CACHE_TTL_SECONDS,
+    enabled=settings.S3_LISTING_CACHE_ENABLED,
+)
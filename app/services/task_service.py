@@ -1,10 +1,11 @@
 from datetime import datetime
-from typing import List, Dict
+from typing import List, Dict, Tuple
 
+from app.core.principal_cache import principal_cache
 from app.interfaces.interfaces import ITaskRepository, IUserRepository
 from app.entities.task import TaskEntity
 from uuid import UUID
-from app.exceptions.exceptions import ResponsibleTypeError, UserNotFoundError, ErrorTaskSettings
+from app.exceptions.exceptions import ResponsibleTypeError, UserNotFoundError, ErrorTaskSettings, TaskNotFound
 
 
 class TaskService:
@@ -14,8 +15,27 @@ class TaskService:
         self.repo = repository
         self.user_repo = user_repository
 
-    async def get(self, ids: List[UUID] = None, user_id: UUID = None) -> List[TaskEntity]:
-        result = await self.repo.get(ids, user_id)
+    async def get(
+        self,
+        ids: List[UUID] = None,
+        user_id: UUID = None,
+        owner_id: UUID = None,
+        status: str = None,
+        expired_from: datetime = None,
+        expired_to: datetime = None,
+        cursor: str = None,
+        limit: int = 50,
+    ) -> Tuple[List[TaskEntity], str | None]:
+        result = await self.repo.get(
+            task_ids=ids,
+            responsible_id=user_id,
+            owner_id=owner_id,
+            status=status,
+            expired_from=expired_from,
+            expired_to=expired_to,
+            cursor=cursor,
+            limit=limit,
+        )
         return result
 
 
@@ -31,7 +51,17 @@ class TaskService:
 
 
     async def delete(self, task: TaskEntity) -> bool:
+        try:
+            existing = await self.repo.get_by_id(task.id)
+        except TaskNotFound:
+            return False
+
         result = await self.repo.delete(task)
+        if result:
+            # у исполнителей и заказчика меняются списки задач в кэше авторизации
+            await principal_cache.invalidate(
+                [existing.owner.id] + [u.id for u in existing.responsible]
+            )
         return result
 
     async def update(
@@ -77,6 +107,9 @@ class TaskService:
         )
 
         task = await self.repo.create(task)
+        await principal_cache.invalidate(
+            [owner.id] + [u.id for u in responsible]
+        )
 
         attachments = attachments or []
         att_map = await self.check_attachments(attachments)
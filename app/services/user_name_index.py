@@ -0,0 +1,88 @@
+import asyncio
+import re
+from collections import defaultdict
+from typing import Dict, Iterable, List, Tuple
+from uuid import UUID
+
+from app.core.cache_version import bump_cache_version, get_cache_version
+from app.interfaces.interfaces import IUserRepository
+
+_SPACES = re.compile(r"\s+")
+_SPACE_AFTER_DOT = re.compile(r"\.\s+")
+
+
+def normalize_name(value) -> str:
+    """«Иванов  И. И.», «иванов и.и.» и «ИВАНОВ И.И.» дают один ключ; ё равно е."""
+    value = str(value).replace("ё", "е").replace("Ё", "Е")
+    value = _SPACES.sub(" ", value).strip()
+    value = _SPACE_AFTER_DOT.sub(".", value)
+    return value.casefold()
+
+
+class UserNameIndex:
+    """
+    Сопоставление имен из графика нарядов с пользователями.
+    Ключи нормализованы: «Фамилия И.О.» (short_name_2) и фамилия. Фамилии,
+    которые носят несколько пользователей, не сопоставляются, а попадают
+    в ambiguous_surnames.
+    """
+
+    def __init__(self, users: Iterable[Tuple[UUID, str, str]]):
+        by_short_name: Dict[str, List[UUID]] = defaultdict(list)
+        by_surname: Dict[str, List[UUID]] = defaultdict(list)
+        for user_id, surname, short_name_2 in users:
+            by_short_name[normalize_name(short_name_2)].append(user_id)
+            by_surname[normalize_name(surname)].append(user_id)
+
+        self._by_short_name = {
+            k: ids[0] for k, ids in by_short_name.items() if len(ids) == 1
+        }
+        self._by_surname = {
+            k: ids[0] for k, ids in by_surname.items() if len(ids) == 1
+        }
+        self._ambiguous = {
+            k for k, ids in (*by_short_name.items(), *by_surname.items())
+            if len(ids) > 1
+        }
+
+    def by_short_name(self, value) -> UUID | None:
+        return self._by_short_name.get(normalize_name(value))
+
+    def by_surname(self, value) -> UUID | None:
+        return self._by_surname.get(normalize_name(value))
+
+    def is_ambiguous(self, value) -> bool:
+        return normalize_name(value) in self._ambiguous
+
+
+class UserNameIndexCache:
+    """
+    Индекс имен, построенный один раз и общий для импортов в этом процессе.
+    Пересобирается, когда меняется версия в Redis (создание или удаление
+    пользователя в любом воркере вызывает invalidate).
+    """
+
+    VERSION_NAME = "user_names"
+
+    def __init__(self):
+        self._index: UserNameIndex | None = None
+        self._version: int | None = None
+        self._lock = asyncio.Lock()
+
+    async def get(self, user_repo: IUserRepository) -> UserNameIndex:
+        version = await get_cache_version(self.VERSION_NAME)
+        if self._index is not None and version is not None and version == self._version:
+            return self._index
+
+        async with self._lock:
+            if self._index is None or version is None or version != self._version:
+                self._index = UserNameIndex(await user_repo.get_user_names())
+                self._version = version
+            return self._index
+
+    async def invalidate(self):
+        self._index = None
+        await bump_cache_version(self.VERSION_NAME)
+
+
+user_name_index = UserNameIndexCache()
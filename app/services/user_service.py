@@ -1,17 +1,14 @@
 from typing import List
 from uuid import UUID
 
-from passlib.context import CryptContext
-
+from app.core.password_hashing import password_hasher
 from app.entities.user import UserEntity
 from app.interfaces.interfaces import IUserRepository
 from app.exceptions.exceptions import UserNotFoundError
+from app.services.user_name_index import user_name_index
 
 
 class UserService:
-
-    pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
     def __init__(self, user_repo: IUserRepository):
         self.user_repo = user_repo
 
@@ -31,15 +28,16 @@ class UserService:
         )
         user_entity.short_name_2 = f"{user_entity.surname} {user_entity.name[0]}.{user_entity.second_name[0] if user_entity.second_name else ''}{'.' if user_entity.second_name else ''}"
         user = await self.user_repo.create(user=user_entity)
+        await user_name_index.invalidate()
         return user
 
     async def hash_password(self, password: str) -> str:
-        return self.pwd_context.hash(password)
+        return await password_hasher.hash(password)
 
     async def verify_password(
         self, plain_password: str, hashed_password: str
     ) -> bool:
-        return self.pwd_context.verify(plain_password, hashed_password)
+        return await password_hasher.verify(plain_password, hashed_password)
 
     async def get_users_from_ids(
         self, user_id: List[UUID] = None
@@ -3,6 +3,7 @@ from app.entities.post import PostEntity
 from app.entities.rank import RankEntity
 from app.entities.vigil_enum import VigilEnumEntity
 from app.interfaces.interfaces import IUserRepository, IScheduleRepository
+from app.services.reference_data import reference_data
 from typing import List
 
 
@@ -19,17 +20,25 @@ class UtilsService:
     async def set_standard_vigils(
         self, data: List[VigilEnumEntity]
     ) -> List[VigilEnumEntity]:
-        return await self.schedule_repo.create_vigils_type(data=data)
+        result = await self.schedule_repo.create_vigils_type(data=data)
+        await reference_data.invalidate()
+        return result
 
     async def set_standard_duties(
         self, data: List[CompanyDutyEntity]
     ) -> List[CompanyDutyEntity]:
-        return await self.user_repo.create_company_duties(data=data)
+        result = await self.user_repo.create_company_duties(data=data)
+        await reference_data.invalidate()
+        return result
 
     async def set_standard_ranks(self, data: List[RankEntity]):
-        return await self.user_repo.create_ranks(data=data)
+        result = await self.user_repo.create_ranks(data=data)
+        await reference_data.invalidate()
+        return result
 
     async def set_standard_posts(
         self, data: List[PostEntity]
     ) -> List[PostEntity]:
-        return await self.user_repo.create_posts(data=data)
+        result = await self.user_repo.create_posts(data=data)
+        await reference_data.invalidate()
+        return result
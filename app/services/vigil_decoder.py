@@ -0,0 +1,103 @@
+from datetime import datetime
+from typing import Dict, Iterable, List, Tuple
+from uuid import UUID
+
+import pandas as pd
+
+from app.entities.decoded_vigils import DecodedVigils
+
+
+class VigilDecoder:
+    """
+    Разбор ячеек графика нарядов («ЗН Р», «РГ ДТП» и т.п.) в id типов нарядов.
+
+    Строится один раз по строкам VigilEnum: коды name_in_csv разбираются
+    жадно по самому длинному совпадению, а тип наряда выбирается по паре
+    (name_in_csv, post_in_csv). Если у кода есть типы под конкретные
+    должности («Р» -> ДЖ/ДН), берется тип для должности человека, иначе —
+    первый тип с этим кодом.
+    """
+
+    def __init__(self, vigil_types: Iterable):
+        self._by_post: Dict[Tuple[str, str], UUID] = {}
+        self._default: Dict[str, UUID] = {}
+
+        for vigil in vigil_types:
+            code = vigil.name_in_csv
+            post = vigil.post_in_csv
+            if post is None or post == code:
+                self._default.setdefault(code, vigil.id)
+            else:
+                self._by_post.setdefault((code, post), vigil.id)
+
+        codes = {code for code, _ in self._by_post} | set(self._default)
+        self._codes = sorted(codes, key=len, reverse=True)
+        self._memo: Dict[Tuple[str, str], Tuple[UUID, ...]] = {}
+
+    def _tokenize(self, value: str) -> List[str]:
+        tokens = []
+        i = 0
+        while i < len(value):
+            for code in self._codes:
+                if value.startswith(code, i):
+                    tokens.append(code)
+                    i += len(code)
+                    break
+            else:
+                i += 1
+        return tokens
+
+    def decode_cell(self, value: str, position: str | None) -> Tuple[UUID, ...]:
+        key = (value, position)
+        result = self._memo.get(key)
+        if result is not None:
+            return result
+
+        vigil_ids = []
+        for code in dict.fromkeys(self._tokenize(value)):
+            vigil_id = self._by_post.get((code, position)) or self._default.get(
+                code
+            )
+            if vigil_id and vigil_id not in vigil_ids:
+                vigil_ids.append(vigil_id)
+
+        result = tuple(vigil_ids)
+        self._memo[key] = result
+        return result
+
+    def decode_schedule(self, vigils_schedule: dict) -> DecodedVigils:
+        """
+        vigils_schedule: {user_id: {"position": ..., "schedule": {"YYYY-MM-DD": ячейка}}}
+        Ячейки разбираются только для уникальных пар (значение, должность),
+        результат разворачивается на весь график средствами pandas.
+        """
+        frame = pd.DataFrame(
+            [
+                (user_id, date_str, str(cell), data.get("position") or "")
+                for user_id, data in vigils_schedule.items()
+                for date_str, cell in data.get("schedule", {}).items()
+                if cell and cell != "-"
+            ],
+            columns=["user_id", "date", "cell", "position"],
+        )
+        if frame.empty:
+            return DecodedVigils([], [], [])
+
+        keys = frame[["cell", "position"]].drop_duplicates()
+        keys["vigil_id"] = [
+            self.decode_cell(cell, position or None)
+            for cell, position in keys.itertuples(index=False)
+        ]
+
+        frame = (
+            frame.merge(keys, on=["cell", "position"])
+            .explode("vigil_id")
+            .dropna(subset=["vigil_id"])
+        )
+        dates = pd.to_datetime(frame["date"], format="%Y-%m-%d")
+
+        return DecodedVigils(
+            user_ids=frame["user_id"].tolist(),
+            dates=dates.dt.to_pydatetime().tolist(),
+            vigil_ids=frame["vigil_id"].tolist(),
+        )
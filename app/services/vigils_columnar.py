@@ -0,0 +1,78 @@
+import json
+from array import array
+from typing import Dict, Iterable, Iterator, List
+
+# сколько чисел сериализуется за один кусок ответа
+_CHUNK = 20_000
+
+
+class ColumnarVigils:
+    """
+    Компактное представление нарядов для календарных клиентов: даты,
+    пользователи и типы нарядов кодируются словарями, строки —
+    параллельными массивами индексов в этих словарях.
+
+        {"dates": [...], "users": [...], "vigils": [...],
+         "date": [0, 0, 1, ...], "user": [...], "vigil": [...]}
+
+    Индексы хранятся в array, а не в списках объектов, поэтому даже
+    семестр нарядов по роте занимает в памяти единицы мегабайт.
+    """
+
+    def __init__(self):
+        self.dates: Dict[str, int] = {}
+        self.users: Dict[str, int] = {}
+        self.vigils: Dict[str, int] = {}
+        self.date = array("I")
+        self.user = array("I")
+        self.vigil = array("I")
+
+    @staticmethod
+    def _code(dictionary: Dict[str, int], value) -> int:
+        key = str(value)
+        code = dictionary.get(key)
+        if code is None:
+            code = dictionary[key] = len(dictionary)
+        return code
+
+    def add(self, rows: Iterable):
+        """rows: (date, user_id, vigil_id)"""
+        for date, user_id, vigil_id in rows:
+            self.date.append(self._code(self.dates, date.date().isoformat()))
+            self.user.append(self._code(self.users, user_id))
+            self.vigil.append(self._code(self.vigils, vigil_id))
+
+    def __len__(self) -> int:
+        return len(self.date)
+
+    @staticmethod
+    def _keys(dictionary: Dict[str, int]) -> List[str]:
+        return list(dictionary)
+
+    @staticmethod
+    def _iter_array(values: array) -> Iterator[bytes]:
+        yield b"["
+        for i in range(0, len(values), _CHUNK):
+            if i:
+                yield b","
+            yield ",".join(map(str, values[i : i + _CHUNK])).encode()
+        yield b"]"
+
+    def iter_json(self) -> Iterator[bytes]:
+        """JSON ответа по кускам, чтобы не собирать всю строку целиком."""
+        yield (
+            '{"dates":%s,"users":%s,"vigils":%s'
+            % (
+                json.dumps(self._keys(self.dates)),
+                json.dumps(self._keys(self.users)),
+                json.dumps(self._keys(self.vigils)),
+            )
+        ).encode()
+        for name, values in (
+            ("date", self.date),
+            ("user", self.user),
+            ("vigil", self.vigil),
+        ):
+            yield f',"{name}":'.encode()
+            yield from self._iter_array(values)
+        yield b"}"
@@ -0,0 +1,94 @@
+"""
+Сравнение скорости записи нарядов в schedule_vigil: ORM по одной строке
+(как было в save_vigils_schedule) против пакетной вставки (COPY / INSERT).
+
+Нужна рабочая БД из DB_URL (.env). Все данные создаются внутри одной
+транзакции и откатываются в конце, таблицы остаются нетронутыми.
+
+    python -m benchmarks.bench_vigils_import --users 120 --days 184
+"""
+
+import argparse
+import asyncio
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import engine
+from app.models import Rank, ScheduleVigil, User, VigilEnum
+from app.repositories.schedule_repository import ScheduleRepository
+
+
+async def main(users_count: int, days: int):
+    async with engine.connect() as conn:
+        trans = await conn.begin()
+        session = AsyncSession(bind=conn, expire_on_commit=False)
+        try:
+            rank = Rank(name="bench", short_name="bench")
+            vigil = VigilEnum(name="bench", name_in_csv="Б", post_in_csv="Б")
+            session.add_all([rank, vigil])
+            await session.flush()
+
+            users = [
+                User(
+                    username=f"bench_{uuid.uuid4().hex[:12]}",
+                    name="Bench",
+                    surname=f"Bench{i}",
+                    short_name="B. Bench",
+                    short_name_2="Bench B.",
+                    hashed_password="-",
+                    invocation="bench",
+                    rank_id=rank.id,
+                )
+                for i in range(users_count)
+            ]
+            session.add_all(users)
+            await session.flush()
+
+            start = datetime(2000, 1, 1)
+            dates = [start + timedelta(days=d) for d in range(days)]
+            total = users_count * days
+
+            # --- старый путь: объект ORM на каждую строку ---
+            started = time.perf_counter()
+            for user in users:
+                for date in dates:
+                    session.add(
+                        ScheduleVigil(date=date, user_id=user.id, vigil_id=vigil.id)
+                    )
+            await session.flush()
+            orm_elapsed = time.perf_counter() - started
+            session.expunge_all()
+
+            # --- новый путь: пакетная вставка ---
+            rows = [
+                (uuid.uuid4(), date, vigil.id, user.id)
+                for user in users
+                for date in dates
+            ]
+            started = time.perf_counter()
+            await ScheduleRepository(session)._bulk_insert_vigils(rows)
+            bulk_elapsed = time.perf_counter() - started
+
+            print(f"rows: {total}")
+            print(
+                f"orm  : {orm_elapsed:8.3f} s  {total / orm_elapsed:10.0f} rows/s"
+            )
+            print(
+                f"bulk : {bulk_elapsed:8.3f} s  {total / bulk_elapsed:10.0f} rows/s"
+            )
+        finally:
+            await session.close()
+            await trans.rollback()
+
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=120)
+    parser.add_argument("--days", type=int, default=184)
+    args = parser.parse_args()
+    asyncio.run(main(args.users, args.days))
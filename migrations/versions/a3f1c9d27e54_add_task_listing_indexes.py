@@ -0,0 +1,64 @@
+"""Add task listing indexes
+
+Revision ID: a3f1c9d27e54
+Revises: 01ac432c8294
+Create Date: 2026-10-18 10:12:41.318204
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "a3f1c9d27e54"
+down_revision: Union[str, Sequence[str], None] = "01ac432c8294"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # таблицы задач создаются через create_all, поэтому индексы могут уже существовать
+    op.create_index(
+        "tasks_created_at_id_idx",
+        "tasks",
+        ["created_at", "id"],
+        if_not_exists=True,
+    )
+    op.create_index(
+        "tasks_owner_id_created_at_id_idx",
+        "tasks",
+        ["owner_id", "created_at", "id"],
+        if_not_exists=True,
+    )
+    op.create_index(
+        "tasks_expired_at_idx",
+        "tasks",
+        ["expired_at"],
+        if_not_exists=True,
+    )
+    op.create_index(
+        "associate_task_responsibles_user_id_task_id_idx",
+        "associate_task_responsibles",
+        ["user_id", "task_id"],
+        if_not_exists=True,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(
+        "associate_task_responsibles_user_id_task_id_idx",
+        table_name="associate_task_responsibles",
+        if_exists=True,
+    )
+    op.drop_index("tasks_expired_at_idx", table_name="tasks", if_exists=True)
+    op.drop_index(
+        "tasks_owner_id_created_at_id_idx",
+        table_name="tasks",
+        if_exists=True,
+    )
+    op.drop_index(
+        "tasks_created_at_id_idx", table_name="tasks", if_exists=True
+    )
@@ -0,0 +1,54 @@
+"""Add schedule_vigil_stats rollup
+
+Revision ID: c7d2e4f81a90
+Revises: a3f1c9d27e54
+Create Date: 2026-10-18 14:05:12.774310
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "c7d2e4f81a90"
+down_revision: Union[str, Sequence[str], None] = "a3f1c9d27e54"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "schedule_vigil_stats",
+        sa.Column("month", sa.DATE(), nullable=False),
+        sa.Column("user_id", sa.UUID(), nullable=False),
+        sa.Column("vigil_id", sa.UUID(), nullable=False),
+        sa.Column("weekday", sa.SmallInteger(), nullable=False),
+        sa.Column("count", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"]),
+        sa.ForeignKeyConstraint(["vigil_id"], ["vigil_enum.id"]),
+        sa.PrimaryKeyConstraint("month", "user_id", "vigil_id", "weekday"),
+        if_not_exists=True,
+    )
+    # таблицу мог уже создать create_all при старте приложения, поэтому
+    # свертка пересчитывается целиком по уже загруженным нарядам
+    op.execute("DELETE FROM schedule_vigil_stats")
+    op.execute(
+        """
+        INSERT INTO schedule_vigil_stats (month, user_id, vigil_id, weekday, count)
+        SELECT date_trunc('month', date)::date,
+               user_id,
+               vigil_id,
+               (extract(isodow FROM date) - 1)::smallint,
+               count(*)
+        FROM schedule_vigil
+        GROUP BY 1, 2, 3, 4
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("schedule_vigil_stats", if_exists=True)